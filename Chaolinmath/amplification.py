@@ -0,0 +1,299 @@
+from functools import lru_cache
+import numpy as np
+from scipy.linalg import eigh_tridiagonal
+from scipy.sparse import identity
+from scipy.sparse.linalg import LinearOperator, eigs, splu, ArpackNoConvergence
+from explicit_stencil import explicit_operator
+from stability import ALIASES, HYPERBOLIC, mesh_steps
+
+def iteration_operator(A, B=None, C=None, kind='explicit'):
+    """
+    @brief 把 mesh 生成的矩阵变成一步推进的迭代算子, 不形成稠密矩阵
+
+    @param[in] kind str
+        'explicit'       u1 = A u0              (parabolic_operator_forward, 对流方程的显格式)
+        'implicit'       A u1 = B u0, B 默认为单位矩阵 (parabolic_operator_backward/crank_nicholson)
+        'wave_explicit'  u2 = A u1 - u0          (wave_operator_explicit)
+        'wave_implicit'  A u2 = B u1 + C u0      (wave_operator_implicit)
+    两层格式的迭代算子作用在 [u1; u0] 上, 大小为 2*NN.
+
+    @return scipy.sparse.linalg.LinearOperator
+    """
+    NN = A.shape[0]
+    if kind == 'explicit':
+        A = A.tocsr()
+        return LinearOperator((NN, NN), matvec=lambda x: A@x, dtype=A.dtype)
+    elif kind == 'implicit':
+        solve = splu(A.tocsc()).solve
+        B = identity(NN, format='csr') if B is None else B.tocsr()
+        return LinearOperator((NN, NN), matvec=lambda x: solve(B@x), dtype=A.dtype)
+    elif kind == 'wave_explicit':
+        A = A.tocsr()
+        def matvec(x):
+            u1, u0 = x[:NN], x[NN:]
+            return np.concatenate([A@u1 - u0, u1])
+    elif kind == 'wave_implicit':
+        solve = splu(A.tocsc()).solve
+        B = B.tocsr()
+        C = C.tocsr()
+        def matvec(x):
+            u1, u0 = x[:NN], x[NN:]
+            return np.concatenate([solve(B@u1 + C@u0), u1])
+    else:
+        raise ValueError(f"Unknown kind: {kind}")
+    return LinearOperator((2*NN, 2*NN), matvec=matvec, dtype=A.dtype)
+
+def lanczos_extremes(op, m=100, seed=0):
+    """
+    @brief m 步 Lanczos 迭代, 返回对称算子最小和最大的 Ritz 值
+
+    两端的特征值很密集时 (细网格上的离散 Laplace 算子) ARPACK 很难达到容差,
+    而两端的 Ritz 值从谱的内部单调逼近极端特征值, 绝对误差收敛很快,
+    几十到一百步就足以判断谱半径是否超过 1. 每步只做一次矩阵乘向量.
+    """
+    n = op.shape[0]
+    m = min(m, n)
+    q = np.random.default_rng(seed).standard_normal(n)
+    q /= np.linalg.norm(q)
+    q0 = np.zeros(n)
+    alpha = np.zeros(m)
+    beta = np.zeros(m)
+    b = 0.0
+    for j in range(m):
+        w = op@q - b*q0
+        alpha[j] = w@q
+        w -= alpha[j]*q
+        b = np.linalg.norm(w)
+        beta[j] = b
+        if b <= 1e-14*abs(alpha[j]):
+            m = j + 1
+            break
+        q0, q = q, w/b
+    theta = eigh_tridiagonal(alpha[:m], beta[:m-1], eigvals_only=True)
+    return theta[0], theta[-1]
+
+def spectral_radius(op, k=6, symmetric=False, m=100, tol=1e-8, maxiter=300):
+    """
+    @brief 不形成稠密矩阵, 计算迭代算子的谱半径
+
+    对称算子用 lanczos_extremes (结果从下方逼近谱半径); 非对称算子用 Arnoldi
+    迭代 (eigs) 求模最大的 k 个特征值.
+
+    @param[in] op 稀疏矩阵或 LinearOperator
+    @param[in] symmetric bool, 迭代算子是否对称
+    @param[in] m int, Lanczos 迭代步数
+
+    @return rho, 特征值 (对称时为最小和最大的 Ritz 值, 否则按模从大到小排列)
+    """
+    if symmetric:
+        vals = np.array(lanczos_extremes(op, m=m))
+        return np.max(np.abs(vals)), vals
+    k = min(k, op.shape[0] - 2)
+    try:
+        vals = eigs(op, k=k, which='LM', tol=tol, maxiter=maxiter, return_eigenvectors=False)
+    except ArpackNoConvergence as e:
+        # 一个也没有收敛时 (例如迎风格式的矩阵接近 Jordan 块) 用幂迭代估计增长率
+        vals = e.eigenvalues
+        if len(vals) == 0:
+            return power_growth(op), vals
+    vals = vals[np.argsort(-np.abs(vals))]
+    return np.max(np.abs(vals)), vals
+
+def power_growth(op, m=200, seed=0):
+    """
+    @brief 幂迭代估计 (|A^m x|/|x|)^(1/m)
+
+    m 足够大时趋于谱半径; 对非正规矩阵它反映的是 m 步之内的实际增长,
+    这正是长时间计算之前需要检查的量.
+    """
+    x = np.random.default_rng(seed).standard_normal(op.shape[0])
+    x /= np.linalg.norm(x)
+    s = 0.0
+    for i in range(m):
+        x = op@x
+        nx = np.linalg.norm(x)
+        if nx == 0:
+            return 0.0
+        s += np.log(nx)
+        x /= nx
+    return float(np.exp(s/m))
+
+def three_level_radius(A, M=None, m=100):
+    """
+    @brief 三层格式 M u2 = A u1 - M u0 的谱半径
+
+    wave_operator_explicit (M = I) 和 wave_operator_implicit (A2 = -A0 = -M) 都是
+    这种形式, 且 A, M 都是同一个离散 Laplace 算子的多项式 (可交换, 对称).
+    M^{-1}A 的每个特征值 mu 对应的增长因子满足 g^2 - mu g + 1 = 0,
+    |mu| <= 2 时两个根都在单位圆上. 因此只需要用 Lanczos 迭代求 mu 的最大值和
+    最小值, 不必对伴随矩阵做 Arnoldi 迭代 (伴随矩阵的特征值都在单位圆上时
+    Arnoldi 迭代很难收敛).
+
+    @return rho, (mu_min, mu_max)
+    """
+    op = iteration_operator(A) if M is None else iteration_operator(M, A, kind='implicit')
+    mu_min, mu_max = lanczos_extremes(op, m=m)
+    mu = max(abs(mu_max), abs(mu_min))
+    rho = 1.0 if mu <= 2 else (mu + np.sqrt(mu**2 - 4))/2
+    return rho, (mu_min, mu_max)
+
+def amplification_factor(scheme, r, xi, theta=0.25):
+    """
+    @brief 均匀网格上的 von Neumann 增长因子, 对波数向量化
+
+    @param[in] scheme str, 与 stability.ORDER 中的格式名相同
+    @param[in] r float 或 tuple, 每个方向的网比:
+               抛物方程 tau/h^2, 对流方程和波动方程 a*tau/h
+    @param[in] xi numpy.ndarray, 形状为 (..., GD), 每个方向的 xi = kh, 取值于 [0, pi] (对流方程 [-pi, pi])
+
+    @return 增长因子 g, 形状为 (..., ); 波动方程为两层格式, 形状为 (..., 2)
+    """
+    scheme = ALIASES.get(scheme, scheme)
+    r = np.broadcast_to(np.asarray(r, dtype=np.float64), xi.shape[-1:])
+    s = np.sin(xi/2)**2
+    if scheme in ('forward', 'backward', 'crank_nicholson'):
+        z = 4*np.sum(r*s, axis=-1)
+        if scheme == 'forward':
+            return 1 - z
+        elif scheme == 'backward':
+            return 1/(1 + z)
+        return (1 - z/2)/(1 + z/2)
+    elif scheme in ('wave_explicit', 'wave_implicit'):
+        if scheme == 'wave_explicit':
+            theta = 0.0
+        # (1 + theta*z) g^2 - (2 - (1 - 2*theta)*z) g + (1 + theta*z) = 0
+        z = 4*np.sum(r**2*s, axis=-1)
+        b = (2 - (1 - 2*theta)*z)/(1 + theta*z)
+        d = np.sqrt(np.asarray(b**2 - 4, dtype=np.complex128))
+        return np.stack([(b + d)/2, (b - d)/2], axis=-1)
+    elif scheme == 'upwind':
+        # 每个方向 r > 0 用后向差分, r < 0 用前向差分
+        g = 1 - np.sum(np.abs(r)*(1 - np.exp(-1j*np.sign(r)*xi)), axis=-1)
+        return g
+    elif scheme == 'lax_friedrichs':
+        GD = xi.shape[-1]
+        return np.sum(np.cos(xi)/GD - 1j*r*np.sin(xi), axis=-1)
+    elif scheme == 'lax_wendroff':
+        return 1 - np.sum(1j*r*np.sin(xi) + r**2*(1 - np.cos(xi)), axis=-1)
+    else:
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+@lru_cache(maxsize=256)
+def von_neumann_radius(scheme, r, theta=0.25, nxi=512):
+    """
+    @brief 所有波数上增长因子模的最大值, 按 (scheme, r, theta) 缓存
+
+    @param[in] r float 或 tuple (二维), 需要可哈希
+    """
+    GD = len(r) if isinstance(r, tuple) else 1
+    lo = -np.pi if ALIASES.get(scheme, scheme) in HYPERBOLIC else 0.0
+    x = np.linspace(lo, np.pi, nxi)
+    xi = np.stack(np.meshgrid(*([x]*GD), indexing='ij'), axis=-1)
+    return float(np.max(np.abs(amplification_factor(scheme, r, xi, theta=theta))))
+
+def mesh_ratio(mesh, scheme, tau, a=1.0):
+    """
+    @brief 格式对应的网比, 每个方向一个值
+    """
+    scheme = ALIASES.get(scheme, scheme)
+    h = mesh_steps(mesh)
+    if scheme in ('forward', 'backward', 'crank_nicholson'):
+        r = tau/h**2
+    else:
+        r = np.broadcast_to(a, h.shape)*tau/h
+    return tuple(float(v) for v in r)
+
+_cache = {}
+
+def analyze(mesh, scheme, tau, a=1.0, theta=0.25, method='von_neumann', k=6, m=100):
+    """
+    @brief 格式迭代算子的谱半径, 结果按 (scheme, r, theta, method, 网格形状) 缓存
+
+    @param[in] method str, 'von_neumann' 用增长因子的解析式 (与网格大小无关);
+               'sparse' 用 mesh 生成的稀疏矩阵做 Lanczos/Arnoldi 迭代 (m 为 Lanczos 步数)
+               (包括边界的影响, 矩阵必须能够生成, 例如 fealpy 的向前欧拉矩阵在
+               不稳定时直接报错)
+    """
+    scheme = ALIASES.get(scheme, scheme)
+    r = mesh_ratio(mesh, scheme, tau, a)
+    if len(r) == 1:
+        r = r[0]
+    shape = mesh.function().shape
+    key = (scheme, r, theta, method, shape)
+    if key in _cache:
+        return _cache[key]
+
+    if method == 'von_neumann':
+        rho = von_neumann_radius(scheme, r, theta=theta)
+    elif method == 'sparse':
+        op = None
+        symmetric = False
+        if scheme == 'forward':
+            op = iteration_operator(mesh.parabolic_operator_forward(tau))
+            symmetric = True
+        elif scheme == 'backward':
+            op = iteration_operator(mesh.parabolic_operator_backward(tau), kind='implicit')
+            symmetric = True
+        elif scheme == 'crank_nicholson':
+            A, B = mesh.parabolic_operator_crank_nicholson(tau)
+            op = iteration_operator(A, B, kind='implicit')
+            symmetric = True
+        elif scheme == 'wave_explicit':
+            rho, _ = three_level_radius(mesh.wave_operator_explicit(tau, a), m=m)
+        elif scheme == 'wave_implicit':
+            A0, A1, A2 = mesh.wave_operator_implicit(tau, a, theta)
+            if abs(A0 + A2).max() == 0:
+                rho, _ = three_level_radius(A1, M=A0, m=m)
+            else:
+                op = iteration_operator(A0, A1, A2, kind='wave_implicit')
+        elif scheme in HYPERBOLIC:
+            op = iteration_operator(explicit_operator(mesh, scheme, tau, a, backend='csr'))
+        else:
+            raise ValueError(f"Unknown scheme: {scheme}")
+        if op is not None:
+            rho, _ = spectral_radius(op, k=k, symmetric=symmetric, m=m)
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    _cache[key] = rho
+    return rho
+
+def guard(mesh, scheme, tau, a=1.0, theta=0.25, method='von_neumann', tol=1e-8):
+    """
+    @brief 在长时间计算开始之前检查谱半径, 大于 1 时抛出 ValueError
+    """
+    rho = analyze(mesh, scheme, tau, a=a, theta=theta, method=method)
+    if rho > 1 + tol:
+        raise ValueError(f"The spectral radius of {scheme}: {rho} should not exceed 1")
+    return rho
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh1d, UniformMesh2d
+
+    nx = 200
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    h = mesh.h
+    print(f"{'scheme':<16} {'r':>6} {'von Neumann':>12} {'sparse':>12}")
+    for scheme, r in [('forward', 0.4), ('backward', 2.0), ('crank_nicholson', 2.0),
+            ('wave_explicit', 0.9), ('wave_implicit', 3.0), ('upwind', 0.8),
+            ('lax_friedrichs', 0.8), ('lax_wendroff', 0.8)]:
+        if scheme in ('forward', 'backward', 'crank_nicholson'):
+            tau = r*h**2
+        else:
+            tau = r*h
+        rho0 = analyze(mesh, scheme, tau)
+        rho1 = analyze(mesh, scheme, tau, method='sparse')
+        print(f"{scheme:<16} {r:6.2f} {rho0:12.8f} {rho1:12.8f}")
+    print("forward, r = 0.6:", von_neumann_radius('forward', 0.6))
+    print("upwind, r = 1.2:", von_neumann_radius('upwind', 1.2))
+
+    nx = 1000
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    tau = 0.2/nx**2
+    start = time.time()
+    rho = analyze(mesh, 'forward', tau, method='sparse')
+    print(f"forward on {mesh.number_of_nodes()} nodes: rho = {rho:.8f}, {time.time() - start:.3f}s")
+    start = time.time()
+    guard(mesh, 'forward', tau, method='sparse')
+    print(f"cached: {time.time() - start:.6f}s")
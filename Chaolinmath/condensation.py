@@ -0,0 +1,147 @@
+import numpy as np
+from scipy.sparse.linalg import splu
+from tridiagonal import TridiagonalMatrix
+
+try:
+    # scipy 没有公开写入已有数组的稀疏矩阵乘向量, 私有接口不可用时退回 A@x
+    from scipy.sparse._sparsetools import csr_matvec as _csr_matvec
+except ImportError:
+    _csr_matvec = None
+
+INPLACE_MATVEC = _csr_matvec is not None
+
+def csr_matvec(A, x, out):
+    """
+    @brief 计算 A@x 并写入 out
+
+    scipy 提供底层的 csr_matvec 时直接累加到 out, 不分配新的数组;
+    否则用公开接口 A@x 计算后复制到 out (会分配一个临时数组), 见 INPLACE_MATVEC.
+
+    @param[in] A scipy.sparse.csr_matrix, 已排序的 CSR 矩阵
+    @param[in] x numpy.ndarray, 一维连续数组
+    @param[out] out numpy.ndarray, 一维连续数组
+    """
+    if _csr_matvec is None:
+        np.copyto(out, A@x)
+        return out
+    out.fill(0.0)
+    _csr_matvec(A.shape[0], A.shape[1], A.indptr, A.indices, A.data, x, out)
+    return out
+
+class DirichletCondensation:
+    """
+    @brief Dirichlet 边界节点的静态凝聚
+
+    把节点一次性分成内部节点 I 和边界节点 B, 线性方程组 A u = f 变成
+        A_II u_I = f_I - A_IB g,  u_B = g
+    只分解一次内部块 A_II (一维时为三对角 LU, 二维时为稀疏 LU), 耦合块 A_IB
+    预先取出, 每一步的边界条件只是一次 A_IB@g 的稀疏矩阵乘向量,
+    不再像 mesh.apply_dirichlet_bc 那样每一步修改矩阵的行和列,
+    方程组的规模也去掉了边界节点.
+
+    与 mesh.apply_dirichlet_bc + spsolve 的结果相同.
+    """
+    def __init__(self, A, isBdNode):
+        """
+        @param[in] A scipy 稀疏矩阵, 未处理边界条件的左端矩阵
+        @param[in] isBdNode numpy.ndarray, 边界节点标记 (展平)
+        """
+        A = A.tocsr()
+        self.NN = A.shape[0]
+        self.isBdNode = isBdNode
+        self.inIdx = np.nonzero(~isBdNode)[0]
+        self.bdIdx = np.nonzero(isBdNode)[0]
+        # 一维时内部节点是连续的一段, 用切片存取不需要临时数组
+        I = self.inIdx
+        contiguous = len(I) > 0 and I[-1] - I[0] + 1 == len(I)
+        self._inSlice = slice(I[0], I[-1] + 1) if contiguous else I
+
+        AI = A[self.inIdx]
+        self.AII = AI[:, self.inIdx].tocsr()
+        self.AIB = AI[:, self.bdIdx].tocsr()
+        self.AIB.sort_indices()
+        if TridiagonalMatrix.is_tridiagonal(self.AII):
+            # 一维网格按节点顺序排列, 内部块仍是三对角的
+            self._T = TridiagonalMatrix.from_sparse(self.AII).factorize()
+            self._lu = None
+        else:
+            self._T = None
+            self._lu = splu(self.AII.tocsc())
+        self._rhs = np.zeros(len(self.inIdx), dtype=np.float64)
+        self._w = np.zeros(len(self.inIdx), dtype=np.float64)
+
+    def lift(self, gb, out=None):
+        """
+        @brief 边界值对内部方程的贡献 A_IB@g
+        """
+        if out is None:
+            return self.AIB@gb
+        return csr_matvec(self.AIB, gb, out)
+
+    def solve(self, f, gb, out=None):
+        """
+        @brief 求解 A u = f, 边界节点上 u = gb
+
+        @param[in] f numpy.ndarray, 形状为 (NN, ) 或 (NN, k), 未处理边界条件的右端项
+        @param[in] gb numpy.ndarray, 边界节点上的值, 顺序与 isBdNode 一致;
+                   f 为 (NN, k) 时形状可以是 (nb, ) (各列共用) 或 (nb, k)
+        @param[out] out numpy.ndarray, 存放解的数组, 可以与 f 相同; 默认返回新数组
+
+        一维单个右端项时只使用预先分配的工作数组
+        """
+        if f.ndim == 2:
+            nb = len(self.bdIdx)
+            gb = np.asarray(gb)
+            if gb.shape == (nb, ):
+                gb = gb[:, None]
+            elif gb.shape != (nb, f.shape[1]):
+                raise ValueError(f"gb should have shape ({nb},) or ({nb}, {f.shape[1]}), "
+                                 f"got {gb.shape}")
+            rhs = f[self.inIdx] - self.AIB@gb
+            u = np.empty_like(f) if out is None else out
+            u[self.inIdx] = self._solve(rhs)
+            u[self.bdIdx] = gb
+            return u
+
+        rhs = self._rhs
+        rhs[:] = f[self._inSlice]
+        rhs -= self.lift(gb, out=self._w)
+        u = np.empty_like(f) if out is None else out
+        u[self._inSlice] = self._solve(rhs)
+        np.put(u, self.bdIdx, gb)
+        return u
+
+    def _solve(self, rhs):
+        if self._T is not None:
+            return self._T.solve(rhs, overwrite_b=True)
+        return self._lu.solve(rhs)
+
+
+if __name__ == '__main__':
+    import time
+    from scipy.sparse.linalg import spsolve
+    from fealpy.mesh import UniformMesh2d
+
+    nx = 200
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    node = mesh.entity('node').reshape(-1, 2)
+    isBdNode = mesh.ds.boundary_node_flag()
+    tau = 1e-3
+    A, B = mesh.parabolic_operator_crank_nicholson(tau)
+    gD = lambda p: np.sin(p[..., 0])*np.cos(p[..., 1])
+    uh = mesh.interpolate(gD, 'node').reshape(-1)
+    f = B@uh
+
+    start = time.time()
+    A0, f0 = mesh.apply_dirichlet_bc(gD, A, f.copy())
+    u0 = spsolve(A0, f0)
+    print(f"apply_dirichlet_bc + spsolve: {time.time() - start:.3f}s")
+
+    start = time.time()
+    C = DirichletCondensation(A, isBdNode)
+    print(f"condensation setup: {time.time() - start:.3f}s")
+    start = time.time()
+    for i in range(10):
+        u1 = C.solve(f, gD(node[isBdNode]))
+    print(f"condensed solve: {(time.time() - start)/10:.4f}s per step")
+    print("difference:", np.max(np.abs(u0 - u1)))
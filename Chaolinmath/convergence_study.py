@@ -0,0 +1,147 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from fealpy.mesh import UniformMesh1d, UniformMesh2d
+from condensation import DirichletCondensation
+from time_integrator import ParabolicIntegrator, WaveIntegrator
+
+def make_mesh(pde, nx):
+    """
+    @brief 在 PDE 的区域上生成 nx 段 (二维时每个方向 nx 段) 的均匀网格
+    """
+    domain = pde.domain()
+    if len(domain) == 2:
+        hx = (domain[1] - domain[0])/nx
+        return UniformMesh1d([0, nx], h=hx, origin=domain[0])
+    else:
+        hx = (domain[1] - domain[0])/nx
+        hy = (domain[3] - domain[2])/nx
+        return UniformMesh2d([0, nx, 0, nx], h=(hx, hy), origin=(domain[0], domain[2]))
+
+def _flat_node(mesh):
+    node = mesh.entity('node')
+    return node if node.ndim == 1 else node.reshape(-1, node.shape[-1])
+
+def solve_poisson(pde, mesh, nt=None):
+    """
+    @brief 椭圆方程 -Δu = f
+    """
+    A = mesh.laplace_operator()
+    f = mesh.interpolate(pde.source, 'node').reshape(-1)
+    isBdNode = mesh.ds.boundary_node_flag()
+    node = _flat_node(mesh)
+    return DirichletCondensation(A, isBdNode).solve(f, pde.dirichlet(node[isBdNode])), None
+
+def solve_parabolic(pde, mesh, nt, scheme='crank_nicholson'):
+    """
+    @brief 抛物方程 u_t - Δu = f, 从初始时刻推进 nt 步
+
+    @param[in] scheme str, 'forward', 'backward' 或 'crank_nicholson'
+
+    @return 终止时刻的数值解 (展平), 终止时刻
+    """
+    for t, uh in ParabolicIntegrator(mesh, pde, nt, scheme).steps():
+        pass
+    return uh.reshape(-1), t
+
+def solve_wave(pde, mesh, nt, scheme='wave_implicit', a=1, theta=0.25):
+    """
+    @brief 波动方程 u_tt - a^2 Δu = f, 从初始时刻推进 nt 步
+
+    @param[in] scheme str, 'wave_explicit' 或 'wave_implicit'
+    """
+    if scheme not in ('wave_explicit', 'wave_implicit'):
+        raise ValueError(f"Unknown scheme: {scheme}")
+    theta = 0.0 if scheme == 'wave_explicit' else theta
+    for t, uh in WaveIntegrator(mesh, pde, nt, a=a, theta=theta).steps():
+        pass
+    return uh.reshape(-1), t
+
+SCHEMES = {
+    'poisson': solve_poisson,
+    'forward': lambda pde, mesh, nt: solve_parabolic(pde, mesh, nt, 'forward'),
+    'backward': lambda pde, mesh, nt: solve_parabolic(pde, mesh, nt, 'backward'),
+    'crank_nicholson': lambda pde, mesh, nt: solve_parabolic(pde, mesh, nt, 'crank_nicholson'),
+    'wave_explicit': lambda pde, mesh, nt: solve_wave(pde, mesh, nt, 'wave_explicit'),
+    'wave_implicit': lambda pde, mesh, nt: solve_wave(pde, mesh, nt, 'wave_implicit'),
+    }
+
+def run_level(pde, scheme, nx, nt):
+    """
+    @brief 计算一个网格层, 返回 (emax, e0, e1)
+
+    @param[in] scheme str 或可调用对象 scheme(pde, mesh, nt) -> (uh, t)
+    """
+    mesh = make_mesh(pde, nx)
+    solver = SCHEMES[scheme] if isinstance(scheme, str) else scheme
+    uh, t = solver(pde, mesh, nt)
+    uh = uh.reshape(mesh.function().shape)
+    if t is None:
+        return mesh.error(pde.solution, uh)
+    else:
+        return mesh.error(lambda p: pde.solution(p, t), uh)
+
+def refinement_levels(nx, nt, maxit, mode='coupled', time_ratio=2):
+    """
+    @brief 生成加密序列
+
+    @param[in] mode str, 'space': 只加密空间, 'time': 只加密时间, 'coupled': 同时加密
+    @param[in] time_ratio int, 同时加密时每层时间步数的倍数, 例如向前欧拉取 4 保持网比不变
+
+    @return [(nx, nt), ...]
+    """
+    if mode == 'space':
+        return [(nx*2**i, nt) for i in range(maxit)]
+    elif mode == 'time':
+        return [(nx, nt*2**i) for i in range(maxit)]
+    elif mode == 'coupled':
+        return [(nx*2**i, nt*time_ratio**i) for i in range(maxit)]
+    else:
+        raise ValueError(f"Unknown mode: {mode}")
+
+def convergence_study(pde, scheme, levels, mode='coupled', max_workers=None):
+    """
+    @brief 在进程池中并行计算所有网格层, 并给出误差和收敛阶
+
+    最细的层最先提交, 总时间约等于最细一层的计算时间.
+
+    @param[in] pde PDE 数据对象 (要能被 pickle, 即定义在模块顶层的类)
+    @param[in] scheme str 或模块顶层的可调用对象
+    @param[in] levels list, [(nx, nt), ...], 可以由 refinement_levels 生成
+    @param[in] mode str, 计算收敛阶时所用的步长: 'space'/'coupled' 用 1/nx, 'time' 用 1/nt
+
+    @return em 形状为 (3, len(levels)) 的误差, order 形状为 (3, len(levels)-1) 的收敛阶
+    """
+    levels = list(levels)
+    em = np.zeros((3, len(levels)), dtype=np.float64)
+    order = np.argsort([-nx**2*nt for nx, nt in levels])
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {i: pool.submit(run_level, pde, scheme, *levels[i]) for i in order}
+        for i, fut in futures.items():
+            em[:, i] = fut.result()
+
+    h = np.array([1/nt if mode == 'time' else 1/nx for nx, nt in levels], dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = np.log(em[:, 0:-1]/em[:, 1:])/np.log(h[0:-1]/h[1:])
+    return em, rate
+
+def format_table(levels, em, rate):
+    """
+    @brief 把误差和收敛阶排成表格
+    """
+    lines = [f"{'nx':>6} {'nt':>7} {'max':>11} {'order':>6} {'L2':>11} {'order':>6} {'H1':>11} {'order':>6}"]
+    for i, (nx, nt) in enumerate(levels):
+        row = f"{nx:>6} {nt:>7}"
+        for k in range(3):
+            r = f"{rate[k, i-1]:6.2f}" if i > 0 else f"{'-':>6}"
+            row += f" {em[k, i]:11.4e} {r}"
+        lines.append(row)
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    from fealpy.pde.parabolic_2d import SinSinExpPDEData
+
+    pde = SinSinExpPDEData()
+    levels = refinement_levels(10, 20, 5, mode='coupled')
+    em, rate = convergence_study(pde, 'crank_nicholson', levels)
+    print(format_table(levels, em, rate))
@@ -0,0 +1,416 @@
+import numpy as np
+from condensation import DirichletCondensation
+from explicit_stencil import stencil_coefficients
+from separable_cache import ExactSolutionCache
+
+# 一维对流方程出流边界的处理, 与 Wilbur_hyperbolic/error_a.py, error_b.py, error_c.py 对应
+OUTFLOW_CLOSURES = ('upwind', 'copy', 'extrapolate')
+
+def ensemble_laplace(U, h, out=None):
+    """
+    @brief 对一组节点数组同时计算 Δ_h U, 边界节点上为零
+
+    @param[in] U numpy.ndarray, 形状为 (nens, nx+1) 或 (nens, nx+1, ny+1)
+    @param[in] h tuple, 每个方向的网格步长
+    """
+    if out is None:
+        out = np.zeros_like(U)
+    else:
+        out.fill(0.0)
+    GD = U.ndim - 1
+    inner = (slice(None), ) + (slice(1, -1), )*GD
+    for d in range(GD):
+        sm = list(inner)
+        sp = list(inner)
+        sm[d+1] = slice(0, -2)
+        sp[d+1] = slice(2, None)
+        out[inner] += (U[tuple(sm)] - 2*U[inner] + U[tuple(sp)])/h[d]**2
+    return out
+
+class EnsembleIntegrator:
+    """
+    @brief 批量时间推进: 同一个格式、同一个网格, 不同的初值和系数
+
+    解的形状为 (nens, nx+1) 或 (nens, nx+1, ny+1), 第一维是样本.
+    显格式每一步对所有样本做一次切片运算; 隐格式对每个不同的系数只分解
+    一次矩阵, 相同系数的样本作为多列右端项一起回代.
+    所有样本共用 PDE 数据的右端项和 Dirichlet 边界条件.
+    """
+    def __init__(self, mesh, pde, nt, coef, init=None):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] pde PDE 数据对象
+        @param[in] nt int, 时间步数
+        @param[in] coef 标量或形状为 (nens, ) 的数组, 每个样本的系数
+        @param[in] init 形状为 (nens, ...) 的初值, 默认所有样本都用 pde.init_solution
+        """
+        self.mesh = mesh
+        self.pde = pde
+        self.nt = nt
+        self.t0, self.t1 = pde.duration()
+        self.tau = (self.t1 - self.t0)/nt
+        if hasattr(mesh, 'ny'):
+            self.h = tuple(mesh.h)
+        else:
+            self.h = (mesh.h, )
+
+        shape = mesh.function().shape
+        if init is not None:
+            init = np.asarray(init, dtype=mesh.ftype)
+            nens = init.shape[0]
+        else:
+            nens = np.size(coef)
+        self.coef = np.broadcast_to(np.asarray(coef, dtype=mesh.ftype), (nens, )).copy()
+        self.nens = nens
+        self.NN = int(np.prod(shape))
+        self.U = np.zeros((nens, ) + shape, dtype=mesh.ftype)
+        self._init = init
+
+        self.exact = ExactSolutionCache(mesh, pde)
+        self.isBdNode = mesh.ds.boundary_node_flag()
+        # 每个不同的系数对应的样本编号
+        values, index = np.unique(self.coef, return_inverse=True)
+        self.groups = [(c, np.nonzero(index == i)[0]) for i, c in enumerate(values)]
+
+    def source(self, t):
+        return self.exact.source(t)
+
+    def initial_value(self, fun):
+        if self._init is not None:
+            return self._init.copy()
+        u0 = self.mesh.interpolate(fun, 'node')
+        return np.broadcast_to(u0, self.U.shape).copy()
+
+    def set_boundary(self, U, t):
+        """
+        @brief 所有样本的边界节点都取 Dirichlet 边界值
+        """
+        Uf = U.reshape(self.nens, -1)
+        Uf[:, self.isBdNode] = self.exact.dirichlet(t)
+        return U
+
+    def factor(self, A):
+        """
+        @brief 边界节点静态凝聚后分解矩阵, 可以求解多列右端项
+        """
+        return DirichletCondensation(A, self.isBdNode)
+
+    def implicit_solve(self, bc, F, t):
+        """
+        @brief 多列右端项的 Dirichlet 边界处理和回代
+
+        @param[in] F numpy.ndarray, 形状为 (NN, m), 每一列是一个样本的右端项
+        """
+        return bc.solve(F, self.exact.dirichlet(t))
+
+    def step(self, n):
+        raise NotImplementedError
+
+    def initialize(self):
+        self.U[:] = self.initial_value(self.pde.init_solution)
+
+    def steps(self):
+        """
+        @brief 时间推进的生成器, 依次给出 (t, U)
+        """
+        self.initialize()
+        yield self.t0, self.U
+        for n in range(self.nt):
+            self.step(n)
+            yield self.t0 + (n+1)*self.tau, self.U
+
+    def run(self):
+        """
+        @brief 推进到终止时刻, 返回所有样本的解
+        """
+        for t, U in self.steps():
+            pass
+        return U
+
+class EnsembleParabolic(EnsembleIntegrator):
+    """
+    @brief 批量求解抛物方程 u_t - k Δu = f, 每个样本可以有不同的 k 和初值
+
+    系数为 k 的矩阵就是 mesh 中时间步长取 k*tau 的抛物算子.
+    """
+    def __init__(self, mesh, pde, nt, scheme='crank_nicholson', k=1.0, init=None):
+        """
+        @param[in] scheme str, 'forward', 'backward' 或 'crank_nicholson'
+        @param[in] k 标量或形状为 (nens, ) 的数组, 热传导系数
+        """
+        super().__init__(mesh, pde, nt, k, init=init)
+        self.scheme = scheme
+        tau = self.tau
+        if scheme == 'forward':
+            r = np.max(self.coef)*tau*sum(1/hi**2 for hi in self.h)
+            if r > 0.5:
+                raise ValueError(f"The k*tau*(1/hx^2 + ...): {r} should be smaller than 0.5")
+            self._k = self.coef.reshape((-1, ) + (1, )*(self.U.ndim - 1))
+        elif scheme in ('backward', 'crank_nicholson'):
+            self.ops = []
+            for k, idx in self.groups:
+                if scheme == 'backward':
+                    A = mesh.parabolic_operator_backward(k*tau)
+                    B = None
+                else:
+                    A, B = mesh.parabolic_operator_crank_nicholson(k*tau)
+                self.ops.append((idx, B, self.factor(A)))
+        else:
+            raise ValueError(f"Unknown scheme: {scheme}")
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        tau = self.tau
+        U = self.U
+        if self.scheme == 'forward':
+            U += tau*self._k*ensemble_laplace(U, self.h)
+            U += tau*self.source(t)
+            self.set_boundary(U, t + tau)
+            return
+
+        Uf = U.reshape(self.nens, -1)
+        for idx, B, bc in self.ops:
+            if self.scheme == 'backward':
+                F = Uf[idx].T + tau*self.source(t + tau).reshape(-1, 1)
+            else:
+                F = B@Uf[idx].T + (tau*(self.source(t) + self.source(t + tau))/2).reshape(-1, 1)
+            Uf[idx] = self.implicit_solve(bc, F, t + tau).T
+
+class EnsembleWave(EnsembleIntegrator):
+    """
+    @brief 批量求解波动方程 u_tt - a^2 Δu = f, 每个样本可以有不同的波速和初值
+
+    theta = 0 时为显格式, 否则为 mesh.wave_operator_implicit 的 theta 格式.
+    """
+    def __init__(self, mesh, pde, nt, a=1.0, theta=0.0, init=None, init_diff_t=None):
+        """
+        @param[in] a 标量或形状为 (nens, ) 的数组, 波速
+        @param[in] init_diff_t 形状为 (nens, ...) 的初始速度, 默认用 pde.init_solution_diff_t
+        """
+        super().__init__(mesh, pde, nt, a, init=init)
+        self.theta = theta
+        self._init_diff_t = init_diff_t
+        self.U0 = np.zeros_like(self.U)
+        self._a2 = (self.coef**2).reshape((-1, ) + (1, )*(self.U.ndim - 1))
+        if theta != 0.0:
+            self.ops = []
+            for a, idx in self.groups:
+                A0, A1, A2 = mesh.wave_operator_implicit(self.tau, a, theta)
+                self.ops.append((idx, A1, A2, self.factor(A0)))
+
+    def initialize(self):
+        self.U0[:] = self.initial_value(self.pde.init_solution)
+        self.U[:] = self.U0
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        tau = self.tau
+        U0, U1 = self.U0, self.U
+        if n == 0:
+            # 第一层用 Taylor 展开 u(tau) = u0 + tau*v0 + tau^2/2*(a^2 Δu0 + f0)
+            if self._init_diff_t is not None:
+                V0 = np.asarray(self._init_diff_t, dtype=U0.dtype)
+            else:
+                V0 = self.mesh.interpolate(self.pde.init_solution_diff_t, 'node')
+            U2 = U0 + tau*V0 + tau**2/2*(self._a2*ensemble_laplace(U0, self.h) + self.source(t))
+            self.set_boundary(U2, t + tau)
+        elif self.theta == 0.0:
+            U2 = 2*U1 - U0 + tau**2*(self._a2*ensemble_laplace(U1, self.h) + self.source(t))
+            self.set_boundary(U2, t + tau)
+        else:
+            U2 = np.empty_like(U1)
+            U0f = U0.reshape(self.nens, -1)
+            U1f = U1.reshape(self.nens, -1)
+            U2f = U2.reshape(self.nens, -1)
+            f = tau**2*self.source(t).reshape(-1, 1)
+            for idx, A1, A2, bc in self.ops:
+                F = A1@U1f[idx].T + A2@U0f[idx].T + f
+                U2f[idx] = self.implicit_solve(bc, F, t + tau).T
+        U0[:] = U1
+        U1[:] = U2
+
+class EnsembleHyperbolic(EnsembleIntegrator):
+    """
+    @brief 批量比较一维对流方程 u_t + a u_x = 0 的格式、出流边界处理和参数
+
+    每个样本 (变体) 可以有不同的格式、出流边界处理和对流速度, 解的形状为
+    (nvar, nx+1). 三点模板的系数按样本排成 (nvar, 1) 的列, 每一步对所有
+    样本只做一次切片运算; 入流边界取 pde.dirichlet, 出流边界按样本分组处理:
+        'upwind'      u_b^{n+1} = u_b^n + |r|(u_{b'}^n - u_b^n), b' 为相邻的内部节点
+        'copy'        u_b^{n+1} = u_{b'}^{n+1}
+        'extrapolate' u_b^{n+1} = 2 u_{b'}^{n+1} - u_{b''}^{n+1}
+    所有样本共用时间步长, 对流速度的符号要相同 (入流边界相同).
+    """
+    def __init__(self, mesh, pde, nt, scheme='lax_wendroff', closure='extrapolate', a=None):
+        """
+        @param[in] scheme str 或 list, 'upwind', 'lax_friedrichs' 或 'lax_wendroff'
+        @param[in] closure str 或 list, 出流边界处理, 见 OUTFLOW_CLOSURES
+        @param[in] a 标量或形状为 (nvar, ) 的数组, 对流速度, 默认取 pde.a()
+        """
+        a = pde.a() if a is None else a
+        scheme, closure, a = (np.atleast_1d(v) for v in np.broadcast_arrays(
+            np.asarray(scheme), np.asarray(closure), np.asarray(a, dtype=mesh.ftype)))
+        nvar = len(a)
+        if not (np.all(a > 0) or np.all(a < 0)):
+            raise ValueError("All variants should have nonzero a of the same sign")
+        for c in np.unique(closure):
+            if c not in OUTFLOW_CLOSURES:
+                raise ValueError(f"Unknown outflow closure: {c}")
+        super().__init__(mesh, pde, nt, a)
+        self.scheme = list(scheme)
+        self.closure = list(closure)
+
+        c0 = np.zeros((nvar, 1), dtype=mesh.ftype)
+        cm = np.zeros((nvar, 1), dtype=mesh.ftype)
+        cp = np.zeros((nvar, 1), dtype=mesh.ftype)
+        for i in range(nvar):
+            _, c0[i], (cm[i], ), (cp[i], ) = stencil_coefficients(mesh, scheme[i], self.tau, a=a[i])
+        self.c0, self.cm, self.cp = c0, cm, cp
+        self.r = np.abs(self.coef)*self.tau/self.h[0]
+
+        # 入流、出流边界节点及出流一侧相邻的两个节点
+        if a[0] > 0:
+            self.inflow, self.outflow = 0, (-1, -2, -3)
+        else:
+            self.inflow, self.outflow = -1, (0, 1, 2)
+        node = mesh.entity('node')
+        self._pin = node[self.inflow]
+        self.closures = [(c, np.nonzero(closure == c)[0]) for c in np.unique(closure)]
+        self.U1 = np.zeros_like(self.U)
+        self._w = np.zeros_like(self.U)
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        U, U1, w = self.U, self.U1, self._w
+        # 所有样本的三点模板
+        np.multiply(U, self.c0, out=U1)
+        np.multiply(U[:, :-1], self.cm, out=w[:, 1:])
+        U1[:, 1:] += w[:, 1:]
+        np.multiply(U[:, 1:], self.cp, out=w[:, :-1])
+        U1[:, :-1] += w[:, :-1]
+
+        U1[:, self.inflow] = self.pde.dirichlet(self._pin, t + self.tau)
+        b, b1, b2 = self.outflow
+        for c, idx in self.closures:
+            if c == 'upwind':
+                U1[idx, b] = U[idx, b] + self.r[idx]*(U[idx, b1] - U[idx, b])
+            elif c == 'copy':
+                U1[idx, b] = U1[idx, b1]
+            else:
+                U1[idx, b] = 2*U1[idx, b1] - U1[idx, b2]
+        self.U, self.U1 = U1, U
+
+    def error_history(self, errortype='max'):
+        """
+        @brief 推进到终止时刻, 给出每个样本在每个时间层上与 pde.solution 的误差
+
+        @param[in] errortype str, 'max' 或 'L2'
+
+        @return 时刻 (nt+1, ) 和误差 (nt+1, nvar)
+        """
+        node = self.mesh.entity('node')
+        times = np.zeros(self.nt + 1)
+        E = np.zeros((self.nt + 1, self.nens))
+        for n, (t, U) in enumerate(self.steps()):
+            e = np.abs(U - self.pde.solution(node, t))
+            times[n] = t
+            if errortype == 'max':
+                E[n] = np.max(e, axis=1)
+            else:
+                E[n] = np.sqrt(self.h[0]*np.sum(e**2, axis=1))
+        return times, E
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh1d
+    from time_integrator import ParabolicIntegrator
+
+    class HeatConductionPDEData:
+        def __init__(self, D=[0, 1], T=[0, 0.1]):
+            self._domain = D
+            self._duration = T
+
+        def domain(self):
+            return self._domain
+
+        def duration(self):
+            return self._duration
+
+        def init_solution(self, p):
+            return np.sin(np.pi*p)
+
+        def source(self, p, t):
+            return np.zeros_like(p)
+
+        def dirichlet(self, p, t):
+            return np.zeros_like(p)
+
+    pde = HeatConductionPDEData()
+    nx = 200
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    node = mesh.entity('node')
+    nt = 1000
+
+    # 500 组不同的热传导系数和初值
+    nens = 500
+    k = np.linspace(0.5, 2, 5).repeat(nens//5)
+    m = np.arange(1, nens+1) % 7 + 1
+    init = np.sin(m[:, None]*np.pi*node[None, :])
+
+    start = time.time()
+    U = EnsembleParabolic(mesh, pde, nt, 'crank_nicholson', k=k, init=init).run()
+    print(f"ensemble of {nens}: {time.time() - start:.3f}s")
+    exact = np.exp(-k[:, None]*(m[:, None]*np.pi)**2*0.1)*init
+    print("max error:", np.max(np.abs(U - exact)))
+
+    # 与逐个求解比较
+    start = time.time()
+    for t, uh in ParabolicIntegrator(mesh, pde, nt, 'crank_nicholson').steps():
+        pass
+    print(f"one member with ParabolicIntegrator: {time.time() - start:.3f}s")
+    U = EnsembleParabolic(mesh, pde, nt, 'crank_nicholson', k=1.0).run()
+    print("difference:", np.max(np.abs(U[0] - uh)))
+
+    # Wilbur_hyperbolic/error_a.py, error_b.py, error_c.py 的三种出流边界处理,
+    # 再加上迎风格式, 共 6 个变体一起推进
+    class Hyperbolic1dPDEData:
+        def __init__(self, D=[0, 1], T=[0, 1]):
+            self._domain = D
+            self._duration = T
+
+        def domain(self):
+            return self._domain
+
+        def duration(self):
+            return self._duration
+
+        def solution(self, p, t):
+            return 1 + np.sin(2*np.pi*(p + 2*t))
+
+        def init_solution(self, p):
+            return 1 + np.sin(2*np.pi*p)
+
+        def dirichlet(self, p, t):
+            return 1 + np.sin(4*np.pi*t)
+
+        def a(self):
+            return -2
+
+    pde = Hyperbolic1dPDEData()
+    nx = 100
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    nt = 800
+    scheme = ['lax_wendroff']*3 + ['upwind']*3
+    closure = list(OUTFLOW_CLOSURES)*2
+
+    start = time.time()
+    times, E = EnsembleHyperbolic(mesh, pde, nt, scheme, closure).error_history()
+    print(f"{len(scheme)} variants together: {time.time() - start:.3f}s")
+    start = time.time()
+    for s, c in zip(scheme, closure):
+        EnsembleHyperbolic(mesh, pde, nt, s, c).error_history()
+    print(f"{len(scheme)} variants one by one: {time.time() - start:.3f}s")
+    print(f"{'scheme':<14}{'closure':<13}{'final':>11}{'max in time':>13}")
+    for i, (s, c) in enumerate(zip(scheme, closure)):
+        print(f"{s:<14}{c:<13}{E[-1, i]:11.3e}{np.max(E[:, i]):13.3e}")
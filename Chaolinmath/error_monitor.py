@@ -0,0 +1,153 @@
+import sys
+import numpy as np
+from separable_cache import ExactSolutionCache
+
+class ErrorMonitor:
+    """
+    @brief 时间推进过程中的误差监控
+
+    不在每一步都计算误差并 print, 而是按设定的频率计算, 结果存放在预先分配的
+    环形缓冲区中, 同时累计全部记录的最大值和平均值 (不受缓冲区大小限制),
+    最后用 summary_table 一次性输出.
+
+    例如
+        monitor = ErrorMonitor(mesh, pde.solution, nt, duration[0], tau, cadence=100)
+        ...
+        monitor.record(n, t, uh0)   # 在 advance 中每一步调用
+        ...
+        write_summary({'forward': monitor})
+    """
+    def __init__(self, mesh, solution, nt, t0, tau, cadence='end', errortype='max', capacity=None):
+        """
+        @param[in] mesh 网格
+        @param[in] solution 真解函数 solution(p, t), 或 ExactSolutionCache (使用缓存的节点值)
+        @param[in] nt int, 时间步数
+        @param[in] t0 float, 初始时刻
+        @param[in] tau float, 时间步长
+        @param[in] cadence int 每隔 cadence 步计算一次; list 在给定时刻 (换算为最近的时间步) 计算;
+                   'end' 只在最后一步计算
+        @param[in] errortype str, 'max' 或 'all' (最大模误差, L2 误差, H1 误差)
+        @param[in] capacity int, 环形缓冲区的长度, 默认能存下全部记录
+        """
+        self.mesh = mesh
+        self.solution = solution
+        self.nt = nt
+        self.errortype = errortype
+        self.ncol = 1 if errortype == 'max' else 3
+
+        if cadence == 'end':
+            steps = np.array([nt], dtype=np.int_)
+        elif isinstance(cadence, (int, np.integer)):
+            steps = np.union1d(np.arange(cadence, nt+1, cadence), [nt])
+        else:
+            steps = np.unique(np.rint((np.asarray(cadence) - t0)/tau).astype(np.int_))
+            steps = steps[(steps >= 0) & (steps <= nt)]
+        self.flag = np.zeros(nt+1, dtype=np.bool_)
+        self.flag[steps] = True
+
+        if capacity is None:
+            capacity = len(steps)
+        self.capacity = capacity
+        self.steps = np.zeros(capacity, dtype=np.int_)
+        self.times = np.zeros(capacity, dtype=np.float64)
+        self.errors = np.zeros((capacity, self.ncol), dtype=np.float64)
+        self.count = 0
+        self.emax = np.zeros(self.ncol, dtype=np.float64)
+        self.esum = np.zeros(self.ncol, dtype=np.float64)
+
+    def due(self, n):
+        """
+        @brief 第 n 步是否需要计算误差
+        """
+        return 0 <= n <= self.nt and self.flag[n]
+
+    def record(self, n, t, uh):
+        """
+        @brief 每一步调用一次, 只在需要时计算误差
+
+        @param[in] n int, 时间步编号
+        @param[in] t float, uh 所在的时刻
+        @param[in] uh numpy.ndarray, 数值解
+        """
+        if not self.due(n):
+            return
+        if isinstance(self.solution, ExactSolutionCache):
+            e = self.solution.error(uh, t, errortype=self.errortype)
+        else:
+            e = self.mesh.error(lambda p: self.solution(p, t), uh, errortype=self.errortype)
+        i = self.count % self.capacity
+        self.steps[i] = n
+        self.times[i] = t
+        self.errors[i] = e
+        self.emax = np.maximum(self.emax, self.errors[i])
+        self.esum += self.errors[i]
+        self.count += 1
+
+    def history(self):
+        """
+        @brief 缓冲区中的记录, 按时间顺序排列
+
+        @return steps, times, errors
+        """
+        n = min(self.count, self.capacity)
+        idx = (np.arange(self.count - n, self.count)) % self.capacity
+        return self.steps[idx], self.times[idx], self.errors[idx]
+
+    def summary(self):
+        """
+        @brief 全部记录的最大误差、平均误差和最后一次记录的误差
+        """
+        if self.count == 0:
+            nan = np.full(self.ncol, np.nan)
+            return nan, nan, nan
+        last = self.errors[(self.count - 1) % self.capacity]
+        return self.emax, self.esum/self.count, last
+
+def summary_table(monitors):
+    """
+    @brief 把多个误差监控的结果排成一张表
+
+    @param[in] monitors dict, 键为格式名, 值为 ErrorMonitor
+    """
+    names = ['emax', 'e0', 'e1']
+    lines = []
+    for name, m in monitors.items():
+        if not lines:
+            head = f"{'scheme':<20} {'records':>8}"
+            for k in range(m.ncol):
+                head += f" {names[k] + '.max':>12} {names[k] + '.mean':>12} {names[k] + '.final':>12}"
+            lines.append(head)
+        emax, emean, elast = m.summary()
+        row = f"{name:<20} {m.count:>8}"
+        for k in range(m.ncol):
+            row += f" {emax[k]:12.4e} {emean[k]:12.4e} {elast[k]:12.4e}"
+        lines.append(row)
+    return "\n".join(lines) + "\n"
+
+def write_summary(monitors, file=None):
+    """
+    @brief 一次性写出误差表, 默认写到标准输出
+    """
+    (file or sys.stdout).write(summary_table(monitors))
+
+
+if __name__ == '__main__':
+    from fealpy.pde.parabolic_2d import SinSinExpPDEData
+    from fealpy.mesh import UniformMesh2d
+    from time_integrator import ParabolicIntegrator
+
+    pde = SinSinExpPDEData()
+    domain = pde.domain()
+    nx = 20
+    hx = (domain[1] - domain[0])/nx
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(hx, hx), origin=(domain[0], domain[2]))
+
+    nt = 6400
+    monitors = {}
+    for scheme in ['forward', 'backward', 'crank_nicholson']:
+        integrator = ParabolicIntegrator(mesh, pde, nt, scheme)
+        m = ErrorMonitor(mesh, pde.solution, nt, integrator.t0, integrator.tau, cadence=100)
+        for n, (t, uh) in enumerate(integrator.steps()):
+            m.record(n, t, uh)
+        monitors[scheme] = m
+    write_summary(monitors)
@@ -0,0 +1,186 @@
+import numpy as np
+from scipy.sparse import diags, csr_matrix
+from stability import check_stability
+
+class StencilOperator:
+    """
+    @brief 显格式迭代矩阵的无矩阵 (matrix-free) 实现
+
+    显格式的迭代矩阵在每个坐标方向上都是三点格式, 因此 A@uh 可以直接用节点数组
+    (nx+1, ) 或 (nx+1, ny+1) 上的切片运算完成, 结果写入预先分配的数组中.
+    与 CSR 矩阵一样, 边界节点上只保留网格内部存在的邻点, 因此结果和 A@uh 完全一致.
+    """
+    def __init__(self, shape, c0, cm, cp, dtype=np.float64):
+        """
+        @brief 初始化函数
+
+        @param[in] shape tuple, 节点数组的形状
+        @param[in] c0 float, 中心节点的系数
+        @param[in] cm tuple, 每个方向上左 (下) 邻点的系数
+        @param[in] cp tuple, 每个方向上右 (上) 邻点的系数
+        """
+        self.shape = tuple(shape)
+        self.c0 = c0
+        self.cm = tuple(cm)
+        self.cp = tuple(cp)
+        self.dtype = dtype
+        self._work = np.zeros(self.shape, dtype=dtype)
+
+        # 每个方向上的 (高位切片, 低位切片)
+        self._slices = []
+        for d in range(len(self.shape)):
+            hi = [slice(None)]*len(self.shape)
+            lo = [slice(None)]*len(self.shape)
+            hi[d] = slice(1, None)
+            lo[d] = slice(0, -1)
+            self._slices.append((tuple(hi), tuple(lo)))
+
+    def matvec(self, uh, out=None):
+        """
+        @brief 计算 A@uh
+
+        @param[in] uh numpy.ndarray, 节点上的函数值, 形状为 shape 或展平后的一维数组
+        @param[out] out numpy.ndarray, 存放结果的数组, 不能与 uh 共用内存; 默认分配新数组
+
+        @return 与 uh 形状相同的结果
+        """
+        flat = uh.ndim == 1 and len(self.shape) > 1
+        u = uh.reshape(self.shape)
+        if out is None:
+            out = np.empty(self.shape, dtype=np.result_type(self.dtype, uh.dtype))
+        elif np.shares_memory(out, uh):
+            # 中心项先写入 out 会覆盖邻点项还要读取的 uh
+            raise ValueError("out should not share memory with uh")
+        o = out.reshape(self.shape)
+        w = self._work
+
+        np.multiply(u, self.c0, out=o)
+        for (hi, lo), cm, cp in zip(self._slices, self.cm, self.cp):
+            if cm != 0: # o[i] += cm*u[i-1]
+                np.multiply(u[lo], cm, out=w[hi])
+                o[hi] += w[hi]
+            if cp != 0: # o[i] += cp*u[i+1]
+                np.multiply(u[hi], cp, out=w[lo])
+                o[lo] += w[lo]
+        return out.reshape(-1) if flat else out
+
+    def __matmul__(self, uh):
+        return self.matvec(uh)
+
+    def tocsr(self):
+        """
+        @brief 组装与模板相同的 CSR 矩阵, 用于检验
+        """
+        NN = int(np.prod(self.shape))
+        k = np.arange(NN).reshape(self.shape)
+        A = diags([self.c0], [0], shape=(NN, NN), format='csr', dtype=self.dtype)
+        for (hi, lo), cm, cp in zip(self._slices, self.cm, self.cp):
+            I = k[hi].flat
+            J = k[lo].flat
+            n = k[hi].size
+            A += csr_matrix((np.broadcast_to(cm, (n, )), (I, J)), shape=(NN, NN), dtype=self.dtype)
+            A += csr_matrix((np.broadcast_to(cp, (n, )), (J, I)), shape=(NN, NN), dtype=self.dtype)
+        return A
+
+def _mesh_shape(mesh):
+    if hasattr(mesh, 'ny'):
+        return (mesh.nx + 1, mesh.ny + 1), np.broadcast_to(mesh.h, (2, ))
+    else:
+        return (mesh.nx + 1, ), np.broadcast_to(mesh.h, (1, ))
+
+def stencil_coefficients(mesh, scheme, tau, a=1):
+    """
+    @brief 计算显格式在每个方向上的三点模板系数
+
+    @param[in] mesh UniformMesh1d 或 UniformMesh2d
+    @param[in] scheme str, 'parabolic_forward', 'upwind', 'lax_friedrichs',
+               'lax_wendroff' 或 'wave_explicit'
+    @param[in] tau float, 时间步长
+    @param[in] a float 或 tuple, 对流速度 (双曲方程) 或波速 (波动方程)
+
+    @return shape, c0, cm, cp
+    """
+    shape, h = _mesh_shape(mesh)
+    GD = len(shape)
+    if scheme in ('parabolic_forward', 'wave_explicit', 'upwind', 'lax_friedrichs', 'lax_wendroff'):
+        check_stability(mesh, scheme, tau, a=a)
+    if scheme == 'parabolic_forward':
+        r = tau/h**2
+        return shape, 1 - 2*np.sum(r), tuple(r), tuple(r)
+    elif scheme == 'wave_explicit':
+        r = a*tau/h
+        return shape, 2*(1 - np.sum(r**2)), tuple(r**2), tuple(r**2)
+
+    r = np.broadcast_to(a, (GD, ))*tau/h
+    if scheme == 'upwind':
+        cm = tuple(np.where(r > 0, r, 0.0))
+        cp = tuple(np.where(r < 0, -r, 0.0))
+        return shape, 1 - np.sum(np.abs(r)), cm, cp
+    elif scheme == 'lax_friedrichs':
+        # 一维: u_j = (u_{j+1} + u_{j-1})/2 - r(u_{j+1} - u_{j-1})/2
+        return shape, 0.0, tuple((1/GD + r)/2), tuple((1/GD - r)/2)
+    elif scheme == 'lax_wendroff':
+        if GD != 1:
+            raise ValueError("The Lax-Wendroff stencil needs the mixed derivative term in 2d")
+        return shape, 1 - np.sum(r**2), tuple(r*(r + 1)/2), tuple(r*(r - 1)/2)
+    else:
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+def explicit_operator(mesh, scheme, tau, a=1, backend='stencil'):
+    """
+    @brief 生成显格式的迭代算子, 可以选择无矩阵模板实现或 CSR 矩阵实现
+
+    @param[in] backend str, 'stencil' 或 'csr'
+
+    @return 支持 A@uh 运算的迭代算子
+    """
+    shape, c0, cm, cp = stencil_coefficients(mesh, scheme, tau, a=a)
+    A = StencilOperator(shape, c0, cm, cp, dtype=mesh.ftype)
+    if backend == 'stencil':
+        return A
+    elif backend == 'csr':
+        return A.tocsr()
+    else:
+        raise ValueError(f"Unknown backend: {backend}")
+
+
+if __name__ == '__main__':
+    from fealpy.mesh import UniformMesh1d, UniformMesh2d
+
+    nx = 100
+    ny = 80
+    mesh1 = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    mesh2 = UniformMesh2d([0, nx, 0, ny], h=(1/nx, 1/ny), origin=(0, 0))
+
+    # 与 FEALPy 中组装的 CSR 矩阵比较
+    for mesh in [mesh1, mesh2]:
+        tau = 0.2*np.min(mesh.h)**2
+        uh = np.random.rand(*_mesh_shape(mesh)[0])
+        A = mesh.parabolic_operator_forward(tau)
+        S = explicit_operator(mesh, 'parabolic_forward', tau)
+        print("parabolic_forward:", np.max(np.abs(A@uh.flat - (S@uh).flat)))
+
+        tau = 0.5*np.min(mesh.h)
+        A = mesh.wave_operator_explicit(tau)
+        S = explicit_operator(mesh, 'wave_explicit', tau)
+        print("wave_explicit:", np.max(np.abs(A@uh.flat - (S@uh).flat)))
+
+    uh = np.random.rand(nx + 1)
+    tau = 0.5/nx
+    for a in [2, -2]:
+        A = mesh1.hyperbolic_operator_explicity_upwind(tau, a)
+        S = explicit_operator(mesh1, 'upwind', tau, a=a)
+        print(f"upwind a={a}:", np.max(np.abs(A@uh - S@uh)))
+        for scheme in ['lax_friedrichs', 'lax_wendroff']:
+            A = explicit_operator(mesh1, scheme, tau, a=a, backend='csr')
+            S = explicit_operator(mesh1, scheme, tau, a=a)
+            print(f"{scheme} a={a}:", np.max(np.abs(A@uh - S@uh)))
+
+    # 时间推进的写法 u = S@u 与 CSR 矩阵逐步一致
+    A = explicit_operator(mesh1, 'lax_wendroff', tau, a=2, backend='csr')
+    S = explicit_operator(mesh1, 'lax_wendroff', tau, a=2)
+    u = v = uh
+    for i in range(10):
+        u = S@u
+        v = A@v
+    print("10 steps of u = S@u:", np.max(np.abs(u - v)))
@@ -0,0 +1,158 @@
+import numpy as np
+from scipy.sparse import bmat, csr_matrix
+from scipy.sparse.linalg import expm_multiply
+from separable_cache import ExactSolutionCache
+
+class ExponentialIntegrator:
+    """
+    @brief 线性抛物方程 u_t - k Δu = f 的指数积分器
+
+    去掉边界节点后, 内部节点满足半离散方程组
+        u_I' = L u_I + b(t),  L = -k K_II,  b(t) = f_I(t) - k K_IB g(t)
+    其中 K 为 mesh.laplace_operator(), g 为 Dirichlet 边界值 (边界提升).
+    用增广矩阵 M = [[L, b], [0, 0]] 的指数作用
+        expm(h M) [u; 1] = [e^{hL} u + h φ1(hL) b; 1]
+    直接从一个输出时刻推进到下一个输出时刻, 不需要固定的时间步长.
+
+    右端项和边界条件与时间无关时 (例如 SinSinExpPDEData) 上式是精确的,
+    每个输出时刻只需要一次 expm_multiply; 与时间有关时每个区间分成 nsub 段,
+    b 取每段中点的值 (指数中点公式, 二阶).
+    """
+    def __init__(self, mesh, pde, k=1.0, nsub=8):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] pde PDE 数据对象
+        @param[in] k float, 热传导系数
+        @param[in] nsub int, 数据与时间有关时, 每两个输出时刻之间的分段数
+        """
+        self.mesh = mesh
+        self.pde = pde
+        self.k = k
+        self.nsub = nsub
+        self.t0, self.t1 = pde.duration()
+        self.shape = mesh.function().shape
+        self.exact = ExactSolutionCache(mesh, pde)
+        self.isBdNode = mesh.ds.boundary_node_flag()
+        self.isInNode = ~self.isBdNode
+
+        K = mesh.laplace_operator().tocsr()
+        self.L = -k*K[self.isInNode][:, self.isInNode]
+        self.B = -k*K[self.isInNode][:, self.isBdNode]
+        self.autonomous = self.is_autonomous()
+
+    def is_autonomous(self):
+        """
+        @brief 右端项和边界条件是否都声明为与时间无关 (见 ExactSolutionCache.is_time_invariant)
+        """
+        return all(self.exact.is_time_invariant(name) for name in ['source', 'dirichlet'])
+
+    def rhs(self, t):
+        """
+        @brief 内部节点上的 b(t) = f_I(t) + B g(t)
+        """
+        f = self.exact.source(t).reshape(-1)[self.isInNode]
+        return f + self.B@self.exact.dirichlet(t)
+
+    def propagate(self, u, t, h):
+        """
+        @brief 内部节点的值从 t 推进到 t + h
+        """
+        if self.autonomous:
+            s = t
+        else:
+            s = t + h/2
+        b = csr_matrix(self.rhs(s).reshape(-1, 1))
+        M = bmat([[self.L, b], [None, csr_matrix((1, 1))]], format='csr')
+        v = np.append(u, 1.0)
+        return expm_multiply(h*M, v)[:-1]
+
+    def full(self, u, t):
+        """
+        @brief 把内部节点的值和边界值拼成完整的节点数组
+        """
+        uh = np.zeros(self.isBdNode.shape, dtype=self.mesh.ftype)
+        uh[self.isInNode] = u
+        uh[self.isBdNode] = self.exact.dirichlet(t)
+        return uh.reshape(self.shape)
+
+    def snapshots(self, times):
+        """
+        @brief 依次给出输出时刻的 (t, uh)
+
+        @param[in] times list, 递增的输出时刻
+        """
+        u0 = self.mesh.interpolate(self.pde.init_solution, 'node')
+        u = u0.reshape(-1)[self.isInNode]
+        t = self.t0
+        for tk in times:
+            if tk < t:
+                raise ValueError(f"The output times should be increasing: {tk} < {t}")
+            n = 1 if self.autonomous else self.nsub
+            h = (tk - t)/n
+            for i in range(n):
+                if h > 0:
+                    u = self.propagate(u, t + i*h, h)
+            t = tk
+            yield t, self.full(u, t)
+
+    def solve(self, times):
+        """
+        @brief 所有输出时刻的解, 形状为 (len(times), ...)
+        """
+        data = np.zeros((len(times), ) + self.shape, dtype=self.mesh.ftype)
+        for k, (t, uh) in enumerate(self.snapshots(times)):
+            data[k] = uh
+        return data
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh2d
+    from time_integrator import ParabolicIntegrator
+    from snapshot import SnapshotScheduler
+
+    class SinSinExpPDEData:
+        def domain(self):
+            return [0, 1, 0, 1]
+
+        def duration(self):
+            return [0, 0.1]
+
+        def solution(self, p, t):
+            pi = np.pi
+            return np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])*np.exp(-2*(pi**2)*t)
+
+        def init_solution(self, p):
+            return self.solution(p, 0.0)
+
+        def source(self, p, t):
+            return np.zeros_like(p[..., 0])
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+        def separable(self):
+            pi = np.pi
+            X = lambda p: np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])
+            T = lambda t: np.exp(-2*(pi**2)*t)
+            return {'solution': (X, T), 'dirichlet': 0, 'source': 0}
+
+    pde = SinSinExpPDEData()
+    nx = 40
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    times = [0.025, 0.05, 0.1]
+
+    start = time.time()
+    data = ExponentialIntegrator(mesh, pde).solve(times)
+    print(f"expm_multiply: {time.time() - start:.3f}s")
+
+    nt = 6400
+    integrator = ParabolicIntegrator(mesh, pde, nt, 'crank_nicholson')
+    sched = SnapshotScheduler(times, integrator.t0, integrator.tau, nt, data.shape[1:])
+    start = time.time()
+    cn = [uk.copy() for tk, uk in sched.select(integrator.steps())]
+    print(f"crank_nicholson, nt = {nt}: {time.time() - start:.3f}s")
+
+    for k, t in enumerate(times):
+        e = mesh.error(lambda p: pde.solution(p, t), data[k], errortype='max')
+        print(f"t = {t}: error = {e:.4e}, |expm - cn| = {np.max(np.abs(data[k] - cn[k])):.4e}")
@@ -0,0 +1,189 @@
+import os
+import subprocess
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# 工作进程中的图像, 由 _init_worker 创建一次, 之后每一帧重复使用
+_worker = {}
+
+def _init_worker(grid, box, plot_type, figsize, dpi, cmap, linestyle):
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from matplotlib.cm import ScalarMappable
+    from matplotlib.colors import Normalize
+
+    fig = plt.figure(figsize=figsize, dpi=dpi)
+    if plot_type == 'surface':
+        axes = fig.add_subplot(1, 1, 1, projection='3d')
+    else:
+        axes = fig.add_subplot(1, 1, 1)
+    if len(box) == 6:
+        # 颜色条只画一次, 各帧的颜色范围都固定为 box[4:6]
+        norm = Normalize(vmin=box[4], vmax=box[5])
+        fig.colorbar(ScalarMappable(norm=norm, cmap=cmap), ax=axes)
+    _worker.update(fig=fig, axes=axes, grid=grid, box=box, plot_type=plot_type,
+            cmap=cmap, linestyle=linestyle)
+
+def _render(n, t, uh):
+    """
+    @brief 在工作进程中画一帧, 返回 RGBA 像素
+    """
+    fig = _worker['fig']
+    axes = _worker['axes']
+    grid = _worker['grid']
+    box = _worker['box']
+    cmap = _worker['cmap']
+    plot_type = _worker['plot_type']
+
+    axes.cla()
+    if len(box) == 4:
+        axes.plot(grid, uh, _worker['linestyle'])
+        axes.set_xlim(box[0:2])
+        axes.set_ylim(box[2:4])
+    elif plot_type == 'imshow':
+        axes.imshow(uh.T, cmap=cmap, vmin=box[4], vmax=box[5], extent=box[0:4],
+                origin='lower', interpolation='bicubic')
+    elif plot_type == 'contourf':
+        axes.contourf(grid[0], grid[1], uh, cmap=cmap, vmin=box[4], vmax=box[5])
+    elif plot_type == 'surface':
+        axes.plot_surface(grid[0], grid[1], uh, cmap=cmap, vmin=box[4], vmax=box[5])
+        axes.set_xlim(box[0:2])
+        axes.set_ylim(box[2:4])
+        axes.set_zlim(box[4:6])
+    else:
+        raise ValueError(f"Unknown plot_type: {plot_type}")
+    axes.set_title("frame=%05d, time=%0.8f" % (n, t))
+
+    fig.canvas.draw()
+    buf = np.asarray(fig.canvas.buffer_rgba())
+    return buf.shape[1], buf.shape[0], buf.tobytes()
+
+class FrameWriter:
+    """
+    @brief 按顺序把 RGBA 帧写给编码器
+
+    fname 中含有 '%' 时 (如 'frames/%05d.png') 把每一帧存为一张图片,
+    否则通过管道交给 ffmpeg 编码为视频.
+    """
+    def __init__(self, fname, fps=20):
+        self.fname = fname
+        self.fps = fps
+        self.count = 0
+        self.proc = None
+
+    def write(self, frame):
+        w, h, data = frame
+        if '%' in self.fname:
+            from PIL import Image
+            Image.frombuffer('RGBA', (w, h), data).save(self.fname % self.count)
+        else:
+            if self.proc is None:
+                from matplotlib import rcParams
+                cmd = [rcParams['animation.ffmpeg_path'], '-y', '-loglevel', 'error',
+                        '-f', 'rawvideo', '-pix_fmt', 'rgba', '-s', f'{w}x{h}',
+                        '-r', str(self.fps), '-i', '-',
+                        '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2',
+                        '-vcodec', 'libx264', '-pix_fmt', 'yuv420p', self.fname]
+                self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+            self.proc.stdin.write(data)
+        self.count += 1
+
+    def close(self):
+        if self.proc is not None:
+            self.proc.stdin.close()
+            if self.proc.wait() != 0:
+                raise RuntimeError(f"ffmpeg failed to write {self.fname}")
+            self.proc = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+def render_animation(mesh, box, advance, fname='test.mp4', plot_type='imshow',
+        frames=1000, every=1, interval=50, figsize=(6.4, 4.8), dpi=100,
+        cmap='rainbow', linestyle='-', max_workers=None):
+    """
+    @brief 不显示窗口、并行画帧的动画输出, 可以代替 mesh.show_animation
+
+    主进程调用 advance(n) 推进求解, 每 every 步把一份解的拷贝交给进程池,
+    工作进程用 Agg 后端画图, 主进程再按帧号顺序写给编码器.
+    同时在画的帧数有上限, 所以不需要保存全部时间步的解.
+
+    @param[in] mesh UniformMesh1d 或 UniformMesh2d
+    @param[in] box 一维为 [xmin, xmax, umin, umax], 二维为 [xmin, xmax, ymin, ymax, umin, umax]
+    @param[in] advance 与 show_animation 相同, advance(n) 返回 (uh, t)
+    @param[in] fname str, 输出文件, 如 'test.mp4' 或 'frames/%05d.png'
+    @param[in] plot_type str, 二维时为 'imshow', 'contourf' 或 'surface'
+    @param[in] frames int, 总的时间步数 (与 show_animation 的 frames 相同)
+    @param[in] every int, 每隔多少步画一帧, 最后一步总会画出
+    @param[in] interval int, 帧间隔 (毫秒)
+
+    @return 写出的帧数
+    """
+    node = mesh.entity('node')
+    if len(box) == 4:
+        grid = node
+    else:
+        grid = (node[..., 0], node[..., 1])
+
+    initargs = (grid, box, plot_type, figsize, dpi, cmap, linestyle)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=initargs) as pool, \
+            FrameWriter(fname, fps=1000/interval) as writer:
+        nwait = 2*(max_workers or os.cpu_count())
+        pending = deque()
+        for n in range(frames):
+            uh, t = advance(n)
+            if n % every != 0 and n != frames - 1:
+                continue
+            pending.append(pool.submit(_render, n, t, np.array(uh)))
+            while len(pending) > nwait:
+                writer.write(pending.popleft().result())
+        while pending:
+            writer.write(pending.popleft().result())
+        return writer.count
+
+
+if __name__ == '__main__':
+    import time
+    from scipy.sparse.linalg import spsolve
+    from fealpy.pde.parabolic_2d import SinSinExpPDEData
+    from fealpy.mesh import UniformMesh2d
+
+    pde = SinSinExpPDEData()
+    domain = pde.domain()
+    duration = pde.duration()
+    nx = 40
+    ny = 40
+    hx = (domain[1] - domain[0])/nx
+    hy = (domain[3] - domain[2])/ny
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(hx, hy), origin=(domain[0], domain[2]))
+
+    nt = 400
+    tau = (duration[1] - duration[0])/nt
+    uh0 = mesh.interpolate(pde.init_solution, 'node')
+
+    def advance_crank_nicholson(n, *fargs):
+        t = duration[0] + n*tau
+        if n == 0:
+            return uh0, t
+        else:
+            A, B = mesh.parabolic_operator_crank_nicholson(tau)
+            source = lambda p: pde.source(p, t + tau)
+            f = mesh.interpolate(source, intertype='node')
+            f *= tau
+            f.flat += B@uh0.flat
+            gD = lambda p: pde.dirichlet(p, t + tau)
+            A, f = mesh.apply_dirichlet_bc(gD, A, f)
+            uh0.flat = spsolve(A, f)
+            return uh0, t
+
+    os.makedirs('frames', exist_ok=True)
+    box = [0, 1, 0, 1, -1, 1]
+    start = time.time()
+    count = render_animation(mesh, box, advance_crank_nicholson, fname='frames/%05d.png',
+            plot_type='contourf', frames=nt + 1, every=10)
+    print(f"{count} frames, {time.time() - start:.2f}s")
@@ -0,0 +1,277 @@
+import os
+import pickle
+import hashlib
+import numpy as np
+import sympy as sp
+from fealpy.decorator import cartesian
+
+x, y, t = sp.symbols('x y t')
+
+# 推导出的符号表达式 pickle 到这个目录中, 以真解和参数的哈希值命名, 之后的运行
+# 直接读取, 不再重复符号求导和化简; 读取后重新 lambdify, 不执行任何生成的源代码
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'manufactured_pde')
+
+# 进程内缓存, 键为 (真解, 方程, 维数, 参数), 值为 (符号表达式, NumPy 函数)
+_cache = {}
+
+# 各级缓存的命中次数, 'derive' 为没有命中、重新推导的次数
+stats = {'memory': 0, 'disk': 0, 'derive': 0}
+
+def derive(u, equation, GD, t0=0.0, k=1, a=1, simplify=False):
+    """
+    @brief 由真解的符号表达式推导右端项、梯度和初值
+
+    @param[in] u sympy 表达式, 真解 u(x, t) 或 u(x, y, t), Poisson 方程不含 t
+    @param[in] equation str, 'heat': u_t - k*Δu = f, 'wave': u_tt - a^2*Δu = f,
+               'advection': u_t + a·∇u = f, 'poisson': -Δu = f
+    @param[in] GD int, 空间维数
+    @param[in] t0 float, 初始时刻
+    @param[in] k float, 热传导系数
+    @param[in] a float 或 tuple, 波速或对流速度
+    @param[in] simplify bool, 是否对右端项调用 sp.simplify (复杂表达式可能很慢)
+
+    @return 字典, 键为 PDE 数据的方法名, 值为符号表达式
+    """
+    X = [x, y][:GD]
+    lap = sum(sp.diff(u, s, 2) for s in X)
+    if equation == 'heat':
+        f = sp.diff(u, t) - k*lap
+    elif equation == 'wave':
+        f = sp.diff(u, t, 2) - a**2*lap
+    elif equation == 'advection':
+        a = np.broadcast_to(a, (GD, ))
+        f = sp.diff(u, t) + sum(ai*sp.diff(u, s) for ai, s in zip(a, X))
+    elif equation == 'poisson':
+        f = -lap
+    else:
+        raise ValueError(f"Unknown equation: {equation}")
+
+    exprs = {
+        'solution': u,
+        'source': sp.simplify(f) if simplify else f,
+        'gradient': [sp.diff(u, s) for s in X]
+        }
+    if equation != 'poisson':
+        exprs['init_solution'] = u.subs(t, t0)
+    if equation == 'wave':
+        exprs['init_solution_diff_t'] = sp.diff(u, t).subs(t, t0)
+    return exprs
+
+def lambdify_exprs(exprs, equation, GD):
+    """
+    @brief 把符号表达式转换为 NumPy 函数 (做过公共子表达式消去)
+
+    @return 字典, 键为方法名, 值为函数
+    """
+    X = [x, y][:GD]
+    funs = {}
+    for name, expr in exprs.items():
+        args = X if (name.startswith('init') or equation == 'poisson') else X + [t]
+        funs[name] = sp.lambdify(args, expr, modules='numpy', cse=True)
+    return funs
+
+def cache_file(u, equation, GD, t0=0.0, k=1, a=1, simplify=False):
+    """
+    @brief 符号表达式的磁盘缓存文件, 以真解的 srepr 和参数的哈希值命名
+    """
+    key = "|".join([sp.srepr(u), equation, str(GD), repr(t0), repr(k),
+        repr(np.asarray(a).tolist()), str(simplify), sp.__version__])
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.pkl')
+
+def generate(u, equation, GD, t0=0.0, k=1, a=1, simplify=False, cache=True):
+    """
+    @brief 推导符号表达式并生成 NumPy 函数
+
+    同一进程中相同的真解和参数只生成一次; 符号表达式同时缓存到磁盘 (见 CACHE_DIR),
+    之后的运行只需要重新 lambdify. 缓存文件损坏时重新推导并覆盖.
+
+    @return exprs, funs 分别为符号表达式和 NumPy 函数的字典
+    """
+    key = (u, equation, GD, t0, k, np.asarray(a).tobytes(), simplify)
+    if cache and key in _cache:
+        stats['memory'] += 1
+        return _cache[key]
+
+    exprs = None
+    if cache:
+        fname = cache_file(u, equation, GD, t0=t0, k=k, a=a, simplify=simplify)
+        try:
+            with open(fname, 'rb') as fd:
+                exprs = pickle.load(fd)
+            stats['disk'] += 1
+        except (OSError, pickle.UnpicklingError, EOFError):
+            exprs = None
+    if exprs is None:
+        exprs = derive(u, equation, GD, t0=t0, k=k, a=a, simplify=simplify)
+        stats['derive'] += 1
+        if cache:
+            # 先写临时文件再改名, 多个进程同时写入时不会读到不完整的文件
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{fname}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as fd:
+                pickle.dump(exprs, fd)
+            os.replace(tmp, fname)
+
+    val = (exprs, lambdify_exprs(exprs, equation, GD))
+    if cache:
+        _cache[key] = val
+    return val
+
+class ManufacturedPDEData:
+    """
+    @brief 由真解符号表达式自动生成的 PDE 数据, 接口与手写的 SinSinExpPDEData 等类相同
+
+    例如二维热方程:
+        u = sp.sin(sp.pi*x)*sp.sin(sp.pi*y)*sp.exp(-2*sp.pi**2*t)
+        pde = ManufacturedPDEData(u, 'heat', D=[0, 1, 0, 1], T=[0, 0.1])
+    """
+    def __init__(self, u, equation='heat', D=[0, 1], T=[0, 1], k=1, a=1, simplify=False, cache=True):
+        """
+        @brief 模型初始化函数
+
+        @param[in] u sympy 表达式或字符串, 真解, 空间变量为 x (和 y), 时间变量为 t
+        @param[in] equation str, 'heat', 'wave', 'advection' 或 'poisson'
+        @param[in] D 模型空间定义域
+        @param[in] T 模型时间定义域
+        @param[in] k 热传导系数
+        @param[in] a 波速或对流速度
+        @param[in] simplify bool, 是否化简右端项
+        @param[in] cache bool, 是否使用进程内和磁盘缓存
+        """
+        if isinstance(u, str):
+            u = sp.sympify(u, locals={'x': x, 'y': y, 't': t})
+        self._domain = D
+        self._duration = T
+        self._a = a
+        self.GD = len(D)//2
+        self.equation = equation
+        self._exprs, self._funs = generate(u, equation, self.GD, t0=T[0], k=k, a=a,
+                simplify=simplify, cache=cache)
+
+    def __getstate__(self):
+        # 生成的函数不能 pickle, 只保存符号表达式, 以便传给进程池
+        state = self.__dict__.copy()
+        del state['_funs']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._funs = lambdify_exprs(self._exprs, self.equation, self.GD)
+
+    def domain(self):
+        """
+        @brief 空间区间
+        """
+        return self._domain
+
+    def duration(self):
+        """
+        @brief 时间区间
+        """
+        return self._duration
+
+    def a(self):
+        """
+        @brief 波速或对流速度
+        """
+        return self._a
+
+    def _call(self, name, p, *args):
+        if self.GD == 1:
+            X = (p, )
+            shape = np.shape(p)
+        else:
+            X = (p[..., 0], p[..., 1])
+            shape = p.shape[:-1]
+        if name not in self._funs:
+            raise AttributeError(f"The {self.equation} problem has no {name}")
+        if name.startswith('init') or self.equation == 'poisson':
+            args = ()
+        val = self._funs[name](*X, *args)
+        if name == 'gradient':
+            return np.stack([v + np.zeros(shape) for v in val], axis=-1) if self.GD > 1 else val[0] + np.zeros(shape)
+        # 常数表达式 (例如右端项为零) 也返回节点数组
+        return val + np.zeros(shape)
+
+    @cartesian
+    def solution(self, p, *t):
+        """
+        @brief 真解函数, Poisson 方程调用方式为 solution(p), 其余为 solution(p, t)
+        """
+        return self._call('solution', p, *t)
+
+    @cartesian
+    def source(self, p, *t):
+        """
+        @brief 方程右端项
+        """
+        return self._call('source', p, *t)
+
+    @cartesian
+    def gradient(self, p, *t):
+        """
+        @brief 真解的空间梯度
+        """
+        return self._call('gradient', p, *t)
+
+    @cartesian
+    def dirichlet(self, p, *t):
+        """
+        @brief Dirichlet 边界条件
+        """
+        return self._call('solution', p, *t)
+
+    @cartesian
+    def init_solution(self, p):
+        """
+        @brief 初值条件
+        """
+        return self._call('init_solution', p)
+
+    @cartesian
+    def init_solution_diff_t(self, p):
+        """
+        @brief 初值条件的时间导数 (波动方程)
+        """
+        return self._call('init_solution_diff_t', p)
+
+
+if __name__ == '__main__':
+    import sys
+    import time
+    import subprocess
+
+    # 与 SinSinExpPDEData 对比
+    start = time.time()
+    u = sp.sin(sp.pi*x)*sp.sin(sp.pi*y)*sp.exp(-2*sp.pi**2*t)
+    pde = ManufacturedPDEData(u, 'heat', D=[0, 1, 0, 1], T=[0, 0.1])
+    print(f"generate: {time.time() - start:.3f}s")
+
+    p = np.random.rand(10, 10, 2)
+    pi = np.pi
+    print("source:", np.max(np.abs(pde.source(p, 0.05))))
+    print("solution:", np.max(np.abs(pde.solution(p, 0.05) -
+        np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])*np.exp(-2*(pi**2)*0.05))))
+
+    # 一维波动方程
+    pde = ManufacturedPDEData('cos(pi*x)*sin(2*pi*t) + x*t**2', 'wave', D=[0, 1], T=[0, 2])
+    print(pde.source(np.linspace(0, 1, 5), 1.0))
+    print(pde.init_solution_diff_t(np.linspace(0, 1, 5)))
+
+    # 磁盘缓存: 删除缓存文件后, 第一个进程重新推导, 第二个进程直接读取
+    u = 'exp(-t)*sin(pi*x)*cos(2*pi*y) + x**3*y*t'
+    fname = cache_file(sp.sympify(u, locals={'x': x, 'y': y, 't': t}), 'heat', 2, t0=0, simplify=True)
+    if os.path.exists(fname):
+        os.remove(fname)
+    code = ("from manufactured_pde import ManufacturedPDEData, stats\n"
+            f"ManufacturedPDEData({u!r}, 'heat', D=[0, 1, 0, 1], T=[0, 1], simplify=True)\n"
+            "print(stats['disk'], stats['derive'])")
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([os.path.dirname(os.path.abspath(__file__)),
+        env.get('PYTHONPATH', '')])
+    for i in range(2):
+        start = time.time()
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True,
+                text=True, check=True).stdout.split()
+        print(f"process {i}: disk hits {out[0]}, derivations {out[1]}, {time.time() - start:.3f}s")
+    assert out == ['1', '0'], "the second process should load the expressions from the disk cache"
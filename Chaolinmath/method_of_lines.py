@@ -0,0 +1,121 @@
+import numpy as np
+from scipy.integrate import solve_ivp
+from separable_cache import ExactSolutionCache
+
+class MethodOfLines:
+    """
+    @brief 线方法: 把网格和 PDE 数据变成半离散的常微分方程组, 交给自适应的刚性求解器
+
+    对 u_t - k Δu = f, 去掉边界节点后内部节点满足
+        u_I' = L u_I + f_I(t) + B g(t),  L = -k K_II,  B = -k K_IB
+    其中 K 为 mesh.laplace_operator(), g 为 Dirichlet 边界值.
+    Jacobi 矩阵就是常数稀疏矩阵 L, 直接传给 solve_ivp 的 BDF/Radau,
+    时间步长由 rtol/atol 自适应控制, 不再需要手工选取 nt.
+    """
+    def __init__(self, mesh, pde, k=1.0):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] pde PDE 数据对象
+        @param[in] k float, 热传导系数
+        """
+        self.mesh = mesh
+        self.pde = pde
+        self.k = k
+        self.t0, self.t1 = pde.duration()
+        self.shape = mesh.function().shape
+        self.exact = ExactSolutionCache(mesh, pde)
+        self.isBdNode = mesh.ds.boundary_node_flag()
+        self.isInNode = ~self.isBdNode
+
+        K = mesh.laplace_operator().tocsr()
+        self.L = (-k*K[self.isInNode][:, self.isInNode]).tocsc()
+        self.B = -k*K[self.isInNode][:, self.isBdNode]
+
+    def fun(self, t, y):
+        """
+        @brief 半离散方程组的右端 L y + f_I(t) + B g(t)
+        """
+        dy = self.L@y
+        if not self.exact.is_zero('source'):
+            dy += self.exact.source(t).reshape(-1)[self.isInNode]
+        if not self.exact.is_zero('dirichlet'):
+            dy += self.B@self.exact.dirichlet(t)
+        return dy
+
+    def full(self, y, t):
+        """
+        @brief 把内部节点的值和边界值拼成完整的节点数组
+        """
+        uh = np.zeros(self.isBdNode.shape, dtype=self.mesh.ftype)
+        uh[self.isInNode] = y
+        uh[self.isBdNode] = self.exact.dirichlet(t)
+        return uh.reshape(self.shape)
+
+    def solve(self, times, method='BDF', rtol=1e-6, atol=1e-9):
+        """
+        @brief 求解到给定的输出时刻
+
+        @param[in] times list, 输出时刻
+        @param[in] method str, solve_ivp 的方法, 'BDF' 和 'Radau' 使用稀疏 Jacobi 矩阵 L
+        @param[in] rtol, atol float, 误差容限
+
+        @return 形状为 (len(times), ...) 的解, 以及 solve_ivp 的结果 (步数等统计信息)
+        """
+        u0 = self.mesh.interpolate(self.pde.init_solution, 'node')
+        y0 = u0.reshape(-1)[self.isInNode]
+        jac = self.L if method in ('BDF', 'Radau') else None
+        sol = solve_ivp(self.fun, (self.t0, max(times)), y0, method=method,
+                rtol=rtol, atol=atol, jac=jac, dense_output=True)
+        if not sol.success:
+            raise RuntimeError(sol.message)
+
+        data = np.zeros((len(times), ) + self.shape, dtype=self.mesh.ftype)
+        for i, t in enumerate(times):
+            data[i] = self.full(sol.sol(t), t)
+        return data, sol
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh2d
+    from time_integrator import ParabolicIntegrator
+
+    class SinSinExpPDEData:
+        def domain(self):
+            return [0, 1, 0, 1]
+
+        def duration(self):
+            return [0, 0.1]
+
+        def solution(self, p, t):
+            pi = np.pi
+            return np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])*np.exp(-2*(pi**2)*t)
+
+        def init_solution(self, p):
+            return self.solution(p, 0.0)
+
+        def source(self, p, t):
+            return np.zeros_like(p[..., 0])
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+    pde = SinSinExpPDEData()
+    nx = 40
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    T = pde.duration()[1]
+
+    mol = MethodOfLines(mesh, pde)
+    for method in ['BDF', 'Radau']:
+        start = time.time()
+        data, sol = mol.solve([T], method=method)
+        e = mesh.error(lambda p: pde.solution(p, T), data[-1], errortype='max')
+        print(f"{method:6}: steps = {len(sol.t) - 1:4d}, nfev = {sol.nfev:4d}, nlu = {sol.nlu:3d}, "
+              f"error = {e:.4e}, {time.time() - start:.3f}s")
+
+    nt = 6400
+    start = time.time()
+    for t, uh in ParabolicIntegrator(mesh, pde, nt, 'forward').steps():
+        pass
+    e = mesh.error(lambda p: pde.solution(p, T), uh, errortype='max')
+    print(f"forward: steps = {nt}, error = {e:.4e}, {time.time() - start:.3f}s")
@@ -0,0 +1,62 @@
+from condensation import DirichletCondensation
+
+# 时间步进算子缓存, 键为 (网格, 节点数, 格式, 时间步长, 边界节点), 值为 (网格, A, B, bc)
+# 值中保留网格的引用, 保证作为键的 id(mesh) 在缓存存在期间不会被其它对象复用
+_operator_cache = {}
+
+def cached_operator(mesh, scheme, tau, isBdNode=None):
+    """
+    @brief 获取缓存的抛物方程时间步进矩阵, 以及左端矩阵对 Dirichlet 边界节点静态凝聚后的分解
+
+    同一个网格、格式和时间步长的矩阵只组装和分解一次, 之后每一步直接复用.
+    网格加密 (节点数改变) 后会重新组装.
+
+    @param[in] mesh UniformMesh1d 或 UniformMesh2d
+    @param[in] scheme str, 'forward', 'backward' 或 'crank_nicholson'
+    @param[in] tau float, 时间步长
+    @param[in] isBdNode numpy.ndarray, Dirichlet 边界节点标记, 默认为网格的边界节点
+
+    @return A, B, bc, isBdNode, 其中 bc 为 DirichletCondensation (向前欧拉没有),
+            用 bc.solve(f, gb) 求解; 只有 CN 格式有右端矩阵 B
+    """
+    if isBdNode is None:
+        isBdNode = mesh.ds.boundary_node_flag()
+    key = (id(mesh), mesh.number_of_nodes(), scheme, tau, isBdNode.tobytes())
+    if key not in _operator_cache:
+        B, bc = None, None
+        if scheme == 'forward':
+            A = mesh.parabolic_operator_forward(tau)
+        elif scheme == 'backward':
+            A = mesh.parabolic_operator_backward(tau)
+        elif scheme == 'crank_nicholson':
+            A, B = mesh.parabolic_operator_crank_nicholson(tau)
+        else:
+            raise ValueError(f"Unknown scheme: {scheme}")
+
+        if scheme != 'forward':
+            # 一维时内部块为三对角的 LAPACK 分解, 二维时为稀疏 LU
+            bc = DirichletCondensation(A, isBdNode)
+        _operator_cache[key] = (mesh, A, B, bc)
+    _, A, B, bc = _operator_cache[key]
+    return A, B, bc, isBdNode
+
+def clear_cache():
+    """
+    @brief 清空缓存, 释放矩阵和分解占用的内存
+    """
+    _operator_cache.clear()
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh2d
+
+    nx = 100
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    for i in range(3):
+        start = time.time()
+        A, B, bc, isBdNode = cached_operator(mesh, 'crank_nicholson', 1e-3)
+        print(f"call {i}: {time.time() - start:.4f}s")
+    mesh.uniform_refine()
+    A, B, bc, isBdNode = cached_operator(mesh, 'crank_nicholson', 1e-3)
+    print("after refinement:", A.shape, "cached operators:", len(_operator_cache))
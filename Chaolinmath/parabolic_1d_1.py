@@ -1,10 +1,11 @@
 from fealpy.decorator import cartesian
 import numpy as np
-from scipy.sparse.linalg import spsolve
 import matplotlib.pyplot as plt
 
 from fealpy.pde.parabolic_1d import SinExpPDEData
 from fealpy.mesh import UniformMesh1d
+from separable_cache import ExactSolutionCache
+from operator_cache import cached_operator
 
 class HeatConductionPDEData:
 
@@ -89,6 +90,14 @@ class HeatConductionPDEData:
         """
         return self.solution(p, t)
 
+    def separable(self):
+        """
+        @brief 分离变量形式: 真解和边界条件为 sin(pi x/L)*exp(-pi^2 t/L^2), 右端项为零
+        """
+        X = lambda p: np.sin(np.pi * p / self._L)
+        T = lambda t: np.exp(-(np.pi**2) * t / self._L**2)
+        return {'solution': (X, T), 'dirichlet': (X, T), 'source': 0}
+
 pde = HeatConductionPDEData()
 
 # 空间离散
@@ -105,6 +114,9 @@ tau = (duration[1] - duration[0])/nt
 #准备初值
 uh0 = mesh.interpolate(pde.init_solution, intertype='node')
 
+# 真解、右端项和边界条件的空间部分只在节点上计算一次
+exact = ExactSolutionCache(mesh, pde)
+
 def parabolic_operator_forward(self, tau):
     """
     @brief 生成抛物方程的向前差分迭代矩阵
@@ -181,15 +193,13 @@ def advance_forward(n, *fargs):
         return uh0, t
     else:
         A = mesh.parabolic_operator_forward(tau)
-        source = lambda p: pde.source(p, t)
-        f = mesh.interpolate(source, intertype='node')
+        f = exact.source(t)
         uh0[:] = A@uh0 + tau*f
 
-        gD = lambda p: pde.dirichlet(p, t)
+        gD = lambda p: exact.dirichlet(t)
         mesh.update_dirichlet_bc(gD, uh0)
 
-        solution = lambda p: pde.solution(p, t)
-        e = mesh.error(solution, uh0, errortype='max')
+        e = exact.error(uh0, t, errortype='max')
         return uh0, t
 
 def advance_backward(n, *fargs): # 点击这里查看 FEALPy 中的代码
@@ -202,18 +212,14 @@ def advance_backward(n, *fargs): # 点击这里查看 FEALPy 中的代码
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_backward(tau)
-        source = lambda p: pde.source(p, t)
-        f = mesh.interpolate(source, intertype='node')
+        _, _, bc, _ = cached_operator(mesh, 'backward', tau)
+        f = exact.source(t)
         f *= tau
         f += uh0
 
-        gD = lambda p: pde.dirichlet(p, t)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0[:] = spsolve(A, f)
+        bc.solve(f, exact.dirichlet(t), out=uh0)
 
-        solution = lambda p: pde.solution(p, t)
-        e = mesh.error(solution, uh0, errortype='max')
+        e = exact.error(uh0, t, errortype='max')
 
         return uh0, t
 
@@ -225,18 +231,14 @@ def advance_crank_nicholson(n, *fargs): # 点击这里查看 FEALPy 中的代码
     if n == 0:
         return uh0, t
     else:
-        A, B = mesh.parabolic_operator_crank_nicholson(tau)
-        source = lambda p: pde.source(p, t)
-        f = mesh.interpolate(source, intertype='node')
+        _, B, bc, _ = cached_operator(mesh, 'crank_nicholson', tau)
+        f = exact.source(t)
         f *= tau
         f += B@uh0
 
-        gD = lambda p: pde.dirichlet(p, t)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0[:] = spsolve(A, f)
+        bc.solve(f, exact.dirichlet(t), out=uh0)
 
-        solution = lambda p: pde.solution(p, t)
-        e = mesh.error(solution, uh0, errortype='max')
+        e = exact.error(uh0, t, errortype='max')
 
         return uh0, t
 
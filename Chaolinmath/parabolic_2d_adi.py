@@ -0,0 +1,138 @@
+import numpy as np
+import matplotlib.pyplot as plt
+from scipy.linalg import solve_banded
+from fealpy.pde.parabolic_2d import SinSinExpPDEData
+from fealpy.mesh.uniform_mesh_2d import UniformMesh2d
+from typing import Tuple
+from error_monitor import ErrorMonitor, write_summary
+
+def tridiag_banded(n, r):
+    """
+    @brief 生成 I - r*delta^2 在 n 个内部节点上的三对角矩阵 (solve_banded 的带状存储)
+
+    @param[in] n int, 内部节点个数
+    @param[in] r float, 网比
+    """
+    ab = np.zeros((3, n), dtype=np.float64)
+    ab[0, 1:] = -r
+    ab[1, :] = 1 + 2*r
+    ab[2, :-1] = -r
+    return ab
+
+def boundary_value(mesh, gD, t):
+    """
+    @brief 计算 x = 左右边界和 y = 上下边界上的 Dirichlet 边界值
+
+    @return gx 形状为 (2, ny+1), gy 形状为 (nx+1, 2)
+    """
+    node = mesh.entity('node')
+    gx = gD(node[[0, -1], :], t)
+    gy = gD(node[:, [0, -1]], t)
+    return gx, gy
+
+def parabolic_adi_step(mesh, uh, pde, t, tau, scheme='peaceman_rachford'):
+    """
+    @brief 用交替方向隐式 (ADI) 方法从 t 推进一步到 t + tau, 结果直接写回 uh
+
+    每一步先沿 x 方向、再沿 y 方向求解一组三对角方程组, 同一方向上所有网格线
+    共用一个三对角矩阵, 因此每个方向只需要一次带多个右端项的 solve_banded.
+
+    @param[in] mesh UniformMesh2d, 网格
+    @param[in, out] uh numpy.ndarray, 形状为 (nx+1, ny+1), t 时刻的数值解
+    @param[in] pde 抛物方程数据, 需要 source(p, t) 和 dirichlet(p, t)
+    @param[in] scheme str, 'peaceman_rachford' (二阶, 对应 CN 格式) 或 'douglas' (一阶, 对应向后欧拉)
+    """
+    nx, ny = mesh.nx, mesh.ny
+    if scheme == 'peaceman_rachford':
+        a = tau/mesh.h[0]**2/2
+        b = tau/mesh.h[1]**2/2
+        ts = t + tau/2
+        c = tau/2
+    elif scheme == 'douglas':
+        a = tau/mesh.h[0]**2
+        b = tau/mesh.h[1]**2
+        ts = t + tau
+        c = tau
+    else:
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+    abx = tridiag_banded(nx-1, a)
+    aby = tridiag_banded(ny-1, b)
+
+    f = mesh.interpolate(lambda p: pde.source(p, ts), intertype='node')
+    gx0 = uh[[0, -1], :]
+    gx1, gy1 = boundary_value(mesh, pde.dirichlet, t + tau)
+
+    # delta_y^2 作用在 x 方向两条边界线的内部节点上
+    d2gx0 = gx0[:, 2:] - 2*gx0[:, 1:-1] + gx0[:, :-2]
+    d2gx1 = gx1[:, 2:] - 2*gx1[:, 1:-1] + gx1[:, :-2]
+    d2u = uh[1:-1, 2:] - 2*uh[1:-1, 1:-1] + uh[1:-1, :-2]
+
+    # 中间层 u* 在 x 方向边界线上的值
+    us = np.empty_like(uh)
+    if scheme == 'peaceman_rachford':
+        us[[0, -1], 1:-1] = 0.5*(gx1[:, 1:-1] - b*d2gx1) + 0.5*(gx0[:, 1:-1] + b*d2gx0)
+    else:
+        us[[0, -1], 1:-1] = gx1[:, 1:-1] - b*d2gx1 + b*d2gx0
+    F = uh[1:-1, 1:-1] + b*d2u + c*f[1:-1, 1:-1]
+
+    # x 方向: 每一列 (固定 j) 是一条网格线
+    F[0, :] += a*us[0, 1:-1]
+    F[-1, :] += a*us[-1, 1:-1]
+    us[1:-1, 1:-1] = solve_banded((1, 1), abx, F)
+
+    # y 方向: 每一行 (固定 i) 是一条网格线
+    if scheme == 'peaceman_rachford':
+        G = us[1:-1, 1:-1] + a*(us[2:, 1:-1] - 2*us[1:-1, 1:-1] + us[:-2, 1:-1]) + c*f[1:-1, 1:-1]
+    else:
+        G = us[1:-1, 1:-1] - b*d2u
+    G[:, 0] += b*gy1[1:-1, 0]
+    G[:, -1] += b*gy1[1:-1, 1]
+    uh[1:-1, 1:-1] = solve_banded((1, 1), aby, G.T).T
+
+    uh[[0, -1], :] = gx1
+    uh[:, [0, -1]] = gy1
+    return uh
+
+
+if __name__ == '__main__':
+    # PDE 模型
+    pde = SinSinExpPDEData()
+
+    # 空间离散
+    domain = pde.domain()
+    nx = 200
+    ny = 200
+    hx = (domain[1] - domain[0])/nx
+    hy = (domain[3] - domain[2])/ny
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(hx, hy), origin=(domain[0], domain[2]))
+
+    # 时间离散
+    duration = pde.duration()
+    nt = 400
+    tau = (duration[1] - duration[0])/nt
+
+    uh0 = mesh.interpolate(pde.init_solution, intertype='node')
+
+    # 每 100 步计算一次最大模误差, 最后统一输出
+    monitor = ErrorMonitor(mesh, pde.solution, nt, duration[0], tau, cadence=100)
+
+    def advance_adi(n: np.int_) -> Tuple[np.ndarray, np.float64]:
+        """
+        @brief 时间步进格式为 Peaceman-Rachford ADI 方法
+
+        @param[in] n int, 表示第 n 个时间步（当前时间步）
+        """
+        t = duration[0] + n*tau
+        if n == 0:
+            return uh0, t
+        else:
+            parabolic_adi_step(mesh, uh0, pde, t, tau)
+            monitor.record(n, t + tau, uh0)
+            return uh0, t
+
+    fig, axes = plt.subplots()
+    box = [0, 1, 0, 1, -1, 1] # 图像显示的范围 0 <= x <= 1, 0 <= y <= 1, -1 <= uh <= 1
+    mesh.show_animation(fig, axes, box, advance_adi, fname='parabolic_2d_adi.mp4', plot_type='imshow', frames=nt + 1)
+    plt.show()
+    write_summary({'peaceman_rachford': monitor})
@@ -1,10 +1,14 @@
 import numpy as np
 import matplotlib.pyplot as plt
 from fealpy.decorator import cartesian
+from scipy.sparse import diags, csr_matrix
 from scipy.sparse.linalg import spsolve
 from fealpy.pde.parabolic_2d import SinSinExpPDEData
 from fealpy.mesh.uniform_mesh_2d import UniformMesh2d
 from typing import Tuple
+from error_monitor import ErrorMonitor, write_summary
+from separable_cache import ExactSolutionCache
+from operator_cache import cached_operator
 
 class SinSinExpPDEData: 
     def __init__(self, D=[0, 1, 0, 1], T=[0, 0.1]):
@@ -95,6 +99,15 @@ class SinSinExpPDEData:
         """
         return self.solution(p, t)
 
+    def separable(self):
+        """
+        @brief 分离变量形式: 真解和边界条件为 sin(pi x)sin(pi y)*exp(-2 pi^2 t), 右端项为零
+        """
+        pi = np.pi
+        X = lambda p: np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])
+        T = lambda t: np.exp(-2*(pi**2)*t)
+        return {'solution': (X, T), 'dirichlet': (X, T), 'source': 0}
+
 # PDE 模型
 pde = SinSinExpPDEData()
 
@@ -113,6 +126,12 @@ tau = (duration[1] - duration[0])/nt
 
 uh0 = mesh.interpolate(pde.init_solution, intertype='node')
 
+# 真解、右端项和边界条件的空间部分只在节点上计算一次
+exact = ExactSolutionCache(mesh, pde)
+
+# 每 100 步计算一次最大模误差, 最后统一输出
+monitor = ErrorMonitor(mesh, exact, nt, duration[0], tau, cadence=100)
+
 def parabolic_operator_forward(self, tau):
     """
     @brief 生成抛物方程的向前差分迭代矩阵
@@ -229,16 +248,13 @@ def advance_forward(n: np.int_) -> Tuple[np.ndarray, np.float64]:
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_forward(tau)
-        source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
-        f = mesh.interpolate(source, intertype='node')
+        A, _, _, _ = cached_operator(mesh, 'forward', tau)
+        f = exact.source(t + tau)
         uh0[:].flat = A@uh0[:].flat + (tau*f[:]).flat
-        gD: Callable[[np.ndarray], np.ndarray] = lambda p: pde.dirichlet(p, t + tau)
+        gD: Callable[[np.ndarray], np.ndarray] = lambda p: exact.dirichlet(t + tau)
         mesh.update_dirichlet_bc(gD, uh0)
 
-        solution: Callable[[np.ndarray], np.ndarray] = lambda p: pde.solution(p, t + tau)
-        e = mesh.error(solution, uh0, errortype='max')
-        print(f"the max error is {e}")
+        monitor.record(n, t + tau, uh0)
         return uh0, t
 
 def advance_backward(n: np.int_) -> Tuple[np.ndarray, np.float64]: 
@@ -251,20 +267,16 @@ def advance_backward(n: np.int_) -> Tuple[np.ndarray, np.float64]:
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_backward(tau)
+        _, _, bc, _ = cached_operator(mesh, 'backward', tau)
 
-        source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
-        f = mesh.interpolate(source, intertype='node')
+        f = exact.source(t + tau)
         f *= tau
         f += uh0
 
-        gD: Callable[[np.ndarray], np.ndarray] = lambda p: pde.dirichlet(p, t + tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0.flat = spsolve(A, f)
+        # 边界值只通过内部与边界的耦合块进入右端项
+        uh0.flat = bc.solve(f.reshape(-1), exact.dirichlet(t + tau))
 
-        solution: Callable[[np.ndarray], np.ndarray] = lambda p: pde.solution(p, t + tau)
-        e = mesh.error(solution, uh0, errortype='max')
-        print(f"the max error is {e}")
+        monitor.record(n, t + tau, uh0)
         return uh0, t
 
 def advance_crank_nicholson(n: np.int_) -> Tuple[np.ndarray, np.float64]:
@@ -277,19 +289,14 @@ def advance_crank_nicholson(n: np.int_) -> Tuple[np.ndarray, np.float64]:
     if n == 0:
         return uh0, t
     else:
-        A, B = mesh.parabolic_operator_crank_nicholson(tau)
-        source = lambda p: pde.source(p, t + tau)
-        f = mesh.interpolate(source, intertype='node') # f.shape = (nx+1,ny+1)
+        _, B, bc, _ = cached_operator(mesh, 'crank_nicholson', tau)
+        f = exact.source(t + tau) # f.shape = (nx+1,ny+1)
         f *= tau
         f.flat[:] += B@uh0.flat[:]
 
-        gD = lambda p: pde.dirichlet(p, t+tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0.flat = spsolve(A, f)
+        uh0.flat = bc.solve(f.reshape(-1), exact.dirichlet(t + tau))
 
-        solution = lambda p: pde.solution(p, t + tau)
-        e = mesh.error(solution, uh0, errortype='max')
-        print(f"the max error is {e}")
+        monitor.record(n, t + tau, uh0)
 
         return uh0, t
 
@@ -298,6 +305,7 @@ fig, axes = plt.subplots()
 box = [0, 1, 0, 1, -1, 1] # 图像显示的范围 0 <= x <= 1, 0 <= y <= 1, -1 <= uh <= 1
 mesh.show_animation(fig, axes, box, advance_forward, fname='parabolic_2d_example_1_af.mp4', plot_type='imshow', frames=nt + 1)
 plt.show()
+write_summary({'forward': monitor})
 
 
 """
@@ -0,0 +1,99 @@
+import ast
+import sys
+import time
+import inspect
+import numpy as np
+
+# 时间步进中会在所有网格节点上反复调用的 PDE 数据方法
+CHECKED_METHODS = ['solution', 'source', 'dirichlet', 'init_solution', 'init_solution_diff_t']
+
+def scan_source(source, fname='<string>'):
+    """
+    @brief 静态检查: 找出 PDE 数据类方法中的 Python 层循环 (不执行脚本)
+
+    @param[in] source str, 脚本源代码
+    @param[in] fname str, 文件名, 只用于输出
+
+    @return 问题列表, 每一项为 (文件名, 行号, 类名.方法名, 说明)
+    """
+    problems = []
+    try:
+        tree = ast.parse(source, filename=fname)
+    except SyntaxError as e:
+        return [(fname, e.lineno or 0, '<module>', f"syntax error: {e.msg}")]
+    for cls in ast.walk(tree):
+        if not isinstance(cls, ast.ClassDef):
+            continue
+        for fun in cls.body:
+            if not isinstance(fun, ast.FunctionDef) or fun.name not in CHECKED_METHODS:
+                continue
+            for node in ast.walk(fun):
+                if isinstance(node, (ast.For, ast.While)):
+                    problems.append((fname, node.lineno, f"{cls.name}.{fun.name}",
+                        "Python loop, evaluate the piecewise function with boolean masks or np.where"))
+                elif isinstance(node, (ast.ListComp, ast.GeneratorExp)):
+                    problems.append((fname, node.lineno, f"{cls.name}.{fun.name}",
+                        "comprehension, use NumPy array operations"))
+    return problems
+
+def check_pde_data(pde, GD, n=None, t=None, maxtime=1e-7):
+    """
+    @brief 动态检查: 在很多节点上调用 PDE 数据的方法, 检查返回值形状和每个点的平均耗时
+
+    在长时间计算开始之前调用, 例如
+        for msg in check_pde_data(pde, GD=2):
+            print(msg)
+
+    @param[in] pde PDE 数据对象
+    @param[in] GD int, 空间维数
+    @param[in] n int, 每个方向的点数, 默认一维 10^6 个点, 二维 1000x1000 个点
+    @param[in] t float, 时间点, 默认为 pde.duration() 的起点
+    @param[in] maxtime float, 每个点允许的平均耗时 (秒), 超过时认为方法中有逐点的 Python 循环
+
+    @return 问题说明的列表, 为空表示通过检查
+    """
+    if n is None:
+        n = 1000000 if GD == 1 else 1000
+    domain = pde.domain()
+    if t is None:
+        t = pde.duration()[0] if hasattr(pde, 'duration') else None
+
+    if GD == 1:
+        p = np.linspace(domain[0], domain[1], n)
+    else:
+        x = np.linspace(domain[0], domain[1], n)
+        y = np.linspace(domain[2], domain[3], n)
+        p = np.stack(np.meshgrid(x, y, indexing='ij'), axis=-1)
+    shape = p.shape if GD == 1 else p.shape[:-1]
+
+    problems = []
+    for name in CHECKED_METHODS:
+        fun = getattr(pde, name, None)
+        if fun is None:
+            continue
+        args = (p, ) if t is None or len(inspect.signature(fun).parameters) == 1 else (p, t)
+        start = time.perf_counter()
+        try:
+            val = fun(*args)
+        except AttributeError: # 该问题没有这个数据
+            continue
+        cost = (time.perf_counter() - start)/np.prod(shape)
+
+        if np.ndim(val) == 0:
+            problems.append(f"{name}: returns a scalar, use np.zeros_like or np.full to return a node array")
+        elif np.shape(val) != shape:
+            problems.append(f"{name}: returns shape {np.shape(val)}, expected {shape}")
+        if cost > maxtime:
+            problems.append(f"{name}: {cost:.2e}s per point, probably a per-element Python loop")
+    return problems
+
+
+if __name__ == '__main__':
+    # 用法: python pde_data_check.py 脚本1.py 脚本2.py ...
+    count = 0
+    for fname in sys.argv[1:]:
+        with open(fname, encoding='utf-8') as f:
+            for item in scan_source(f.read(), fname):
+                print("%s:%d: %s: %s" % item)
+                count += 1
+    sys.exit(1 if count > 0 else 0)
@@ -0,0 +1,161 @@
+import numpy as np
+
+# 可以声明分离变量形式的 PDE 数据方法
+SEPARABLE_METHODS = ['solution', 'source', 'dirichlet']
+
+class ExactSolutionCache:
+    """
+    @brief 分离变量形式的真解、右端项和边界条件的缓存
+
+    PDE 数据类可以定义 separable 方法, 声明 u(p, t) = X(p)*T(t) 的结构, 例如
+        def separable(self):
+            pi = np.pi
+            X = lambda p: np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])
+            T = lambda t: np.exp(-2*(pi**2)*t)
+            return {'solution': (X, T), 'dirichlet': (X, T), 'source': 0}
+    字典的值可以是
+        0       恒为零
+        (X, T)  X(p) 为空间部分, T(t) 为标量的时间部分
+        (X, None) 与时间无关
+    没有声明的方法仍然调用 PDE 数据本身计算.
+    空间部分只在网格节点 (dirichlet 只在边界节点) 上计算一次,
+    之后每一步只需要乘以一个标量.
+    """
+    def __init__(self, mesh, pde):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] pde PDE 数据对象
+        """
+        self.mesh = mesh
+        self.pde = pde
+        node = mesh.entity('node')
+        self.shape = mesh.function().shape
+        self.node = node
+        self.isBdNode = mesh.ds.boundary_node_flag()
+        flat = node if node.ndim == 1 else node.reshape(-1, node.shape[-1])
+        self.bdnode = flat[self.isBdNode]
+
+        decl = pde.separable() if hasattr(pde, 'separable') else {}
+        self._factor = {}
+        for name, d in decl.items():
+            if name not in SEPARABLE_METHODS:
+                raise ValueError(f"{name} can not be declared separable")
+            p = self.bdnode if name == 'dirichlet' else node
+            shape = self.bdnode.shape[:1] if name == 'dirichlet' else self.shape
+            if isinstance(d, (int, float)) and d == 0:
+                self._factor[name] = (np.zeros(shape, dtype=mesh.ftype), None, True)
+            else:
+                X, T = d
+                X = np.array(np.broadcast_to(X(p), shape), dtype=mesh.ftype)
+                self._factor[name] = (X, T, False)
+
+    def is_zero(self, name):
+        """
+        @brief 是否声明为恒为零
+        """
+        return name in self._factor and self._factor[name][2]
+
+    def is_time_invariant(self, name):
+        """
+        @brief 是否声明为与时间无关, 即分离变量形式为 0 或 (X, None)
+
+        没有声明分离变量形式的方法无法判断, 返回 False
+        """
+        return name in self._factor and self._factor[name][1] is None
+
+    def _eval(self, name, t, out):
+        X, T, _ = self._factor[name]
+        if out is None:
+            return X.copy() if T is None else X*T(t)
+        if T is None:
+            out[:] = X
+        else:
+            np.multiply(X, T(t), out=out)
+        return out
+
+    def solution(self, t, out=None):
+        """
+        @brief 网格节点上的真解
+
+        @param[out] out numpy.ndarray, 存放结果的数组, 默认返回新数组
+        """
+        if 'solution' in self._factor:
+            return self._eval('solution', t, out)
+        val = np.broadcast_to(self.pde.solution(self.node, t), self.shape)
+        if out is None:
+            return np.array(val)
+        out[:] = val
+        return out
+
+    def source(self, t, out=None):
+        """
+        @brief 网格节点上的右端项
+        """
+        if 'source' in self._factor:
+            return self._eval('source', t, out)
+        val = self.mesh.interpolate(lambda p: self.pde.source(p, t), 'node')
+        if out is None:
+            return val
+        out[:] = val
+        return out
+
+    def dirichlet(self, t, out=None):
+        """
+        @brief 边界节点上的 Dirichlet 边界值, 顺序与 mesh.ds.boundary_node_flag() 一致
+        """
+        if 'dirichlet' in self._factor:
+            return self._eval('dirichlet', t, out)
+        val = self.pde.dirichlet(self.bdnode, t)
+        if out is None:
+            return val
+        out[:] = val
+        return out
+
+    def error(self, uh, t, errortype='all'):
+        """
+        @brief 与 mesh.error 相同, 但真解使用缓存的节点值
+        """
+        u = self.solution(t)
+        return self.mesh.error(lambda p: u, uh, errortype=errortype)
+
+
+if __name__ == '__main__':
+    import time
+    from fealpy.mesh import UniformMesh2d
+
+    class SinSinExpPDEData:
+        def duration(self):
+            return [0, 0.1]
+
+        def solution(self, p, t):
+            pi = np.pi
+            return np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])*np.exp(-2*(pi**2)*t)
+
+        def source(self, p, t):
+            return np.zeros_like(p[..., 0])
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+        def separable(self):
+            pi = np.pi
+            X = lambda p: np.sin(pi*p[..., 0])*np.sin(pi*p[..., 1])
+            T = lambda t: np.exp(-2*(pi**2)*t)
+            return {'solution': (X, T), 'dirichlet': (X, T), 'source': 0}
+
+    pde = SinSinExpPDEData()
+    nx = 400
+    mesh = UniformMesh2d([0, nx, 0, nx], h=(1/nx, 1/nx), origin=(0, 0))
+    node = mesh.entity('node')
+    cache = ExactSolutionCache(mesh, pde)
+
+    uh = mesh.function()
+    start = time.time()
+    for t in np.linspace(0, 0.1, 100):
+        mesh.error(lambda p: pde.solution(p, t), uh)
+    print(f"mesh.error: {time.time() - start:.3f}s")
+    start = time.time()
+    for t in np.linspace(0, 0.1, 100):
+        cache.error(uh, t)
+    print(f"cached:     {time.time() - start:.3f}s")
+    print("difference:", np.max(np.abs(cache.solution(0.05) - pde.solution(node, 0.05))))
@@ -0,0 +1,99 @@
+import numpy as np
+
+class SnapshotScheduler:
+    """
+    @brief 在指定的输出时刻准确地保存数值解
+
+    不用 `t in [0.5, 1.0]` 比较累加出来的浮点数时间, 而是事先把每个输出时刻
+    换算成时间步编号: 输出时刻是 tau 的整数倍 (在舍入误差范围内) 时, 直接在
+    那一步保存; 否则在相邻两步之间做线性插值. 保存的解放在预先分配的数组
+    self.data 中, 只有到达输出时刻时才返回, 调用方可以只在这些时刻画图、算误差.
+
+    例如
+        sched = SnapshotScheduler([0.5, 1.0, 1.5, 2.0], duration[0], tau, nt, uh0.shape)
+        for i in range(nt+1):
+            u, t = advance(i)
+            for k, tk, uk in sched.update(i, u):
+                ...
+    """
+    def __init__(self, times, t0, tau, nt, shape, dtype=np.float64, rtol=1e-8):
+        """
+        @param[in] times list, 输出时刻
+        @param[in] t0 float, 初始时刻
+        @param[in] tau float, 时间步长
+        @param[in] nt int, 时间步数, 输出时刻必须在 [t0, t0 + nt*tau] 内
+        @param[in] shape tuple, 解的数组形状
+        @param[in] rtol float, 相对于 tau 的容差, 在此范围内认为输出时刻落在时间步上
+        """
+        self.times = np.asarray(times, dtype=np.float64)
+        self.t0 = t0
+        self.tau = tau
+        s = (self.times - t0)/tau
+        out = (s < -rtol) | (s > nt*(1 + rtol))
+        if np.any(out):
+            raise ValueError(f"output times {self.times[out]} are outside "
+                             f"[{t0}, {t0 + nt*tau}]")
+        self.step = np.rint(s).astype(np.int_)
+        self.exact = np.abs(s - self.step) <= rtol*np.maximum(1, np.abs(s))
+        # 不在时间步上的输出时刻, 在第 lower 步和第 lower+1 步之间插值
+        self.lower = np.floor(s).astype(np.int_)
+        self.weight = s - self.lower
+
+        self.data = np.zeros((len(self.times), ) + tuple(shape), dtype=dtype)
+        self.done = np.zeros(len(self.times), dtype=np.bool_)
+        self._prev = np.zeros(tuple(shape), dtype=dtype)
+
+    def due(self, n):
+        """
+        @brief 第 n 步是否有输出 (包括插值的输出)
+        """
+        hit = np.where(self.exact, self.step == n, self.lower + 1 == n)
+        return bool(np.any(hit & ~self.done))
+
+    def update(self, n, uh):
+        """
+        @brief 每一步之后调用一次, 返回这一步完成的输出
+
+        @param[in] n int, 时间步编号, 第 n 步的时刻为 t0 + n*tau
+        @param[in] uh numpy.ndarray, 第 n 步的解
+
+        @return [(k, t_k, u_k), ...], k 为输出时刻的编号, u_k 为 self.data[k]
+        """
+        out = []
+        for k in np.nonzero(~self.done)[0]:
+            if self.exact[k] and self.step[k] == n:
+                self.data[k] = uh
+            elif not self.exact[k] and self.lower[k] + 1 == n:
+                w = self.weight[k]
+                np.multiply(self._prev, 1 - w, out=self.data[k])
+                self.data[k] += w*uh
+            else:
+                continue
+            self.done[k] = True
+            out.append((k, self.times[k], self.data[k]))
+
+        if np.any(~self.done & ~self.exact & (self.lower == n)):
+            self._prev[:] = uh
+        return out
+
+    def select(self, steps):
+        """
+        @brief 配合 TimeIntegrator.steps() 使用, 只给出输出时刻的 (t_k, u_k)
+        """
+        for n, (t, uh) in enumerate(steps):
+            for k, tk, uk in self.update(n, uh):
+                yield tk, uk
+
+
+if __name__ == '__main__':
+    # tau = 0.1 时 3*tau != 0.3, 用浮点数比较会漏掉 0.3 和 0.7 这两个时刻
+    t0 = 0.0
+    nt = 20
+    tau = 2/nt
+    times = [0.3, 0.5, 0.7, 1.0, 1.25]
+    print("t in times:", [t0 + n*tau for n in range(nt+1) if t0 + n*tau in times])
+
+    sched = SnapshotScheduler(times, t0, tau, nt, (1, ))
+    for n in range(nt+1):
+        for k, tk, uk in sched.update(n, np.array([t0 + n*tau])):
+            print(f"t = {tk}: u = {uk[0]}")
@@ -0,0 +1,296 @@
+import numpy as np
+from scipy import fft
+from stability import mesh_steps
+from time_integrator import TimeIntegrator
+
+class FourierSpectral:
+    """
+    @brief UniformMesh1d/2d 节点上的 Fourier 谱变换
+
+    bc = 'periodic': 每个方向最后一个节点与第一个节点重合, 对去掉最后一个
+        节点的值做实 FFT (rfftn), 逆变换后再把第一个节点的值复制到最后一个节点;
+    bc = 'dirichlet': 齐次 Dirichlet 边界, 对内部节点做第一类正弦变换 (DST-I),
+        边界节点为零, 只能用于扩散项.
+    在这个基下 u_t + a·∇u = k Δu 的算子是对角的, 符号为
+        lambda(xi) = -i a·xi - k |xi|^2
+
+    变换的形状、波数、符号和指数传播子在构造时确定并缓存, 同一个对象反复
+    使用 (FFT 本身的计划由 scipy.fft 内部缓存). 变换作用在最后 GD 个轴上,
+    前面的轴是批量的维数, 例如形状为 (nb, nx+1) 的数组一次变换 nb 个函数.
+    节点数组的形状与 mesh.function() 相同, 所以 mesh.error 等接口照常使用.
+    """
+    def __init__(self, mesh, bc='periodic', workers=None):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] bc str, 'periodic' 或 'dirichlet'
+        @param[in] workers int, scipy.fft 的并行线程数
+        """
+        if bc not in ('periodic', 'dirichlet'):
+            raise ValueError(f"Unknown boundary condition: {bc}")
+        self.bc = bc
+        self.workers = workers
+        self.shape = mesh.function().shape
+        self.GD = len(self.shape)
+        self.axes = tuple(range(-self.GD, 0))
+        h = mesh_steps(mesh)
+
+        xi = []
+        if bc == 'periodic':
+            self.n = tuple(N - 1 for N in self.shape)
+            self.index = (slice(0, -1), )*self.GD
+            for d, (n, hd) in enumerate(zip(self.n, h)):
+                # 最后一个轴为实 FFT 的半谱
+                k = fft.rfftfreq(n, hd) if d == self.GD - 1 else fft.fftfreq(n, hd)
+                xi.append(2*np.pi*k)
+        else:
+            self.n = tuple(N - 2 for N in self.shape)
+            self.index = (slice(1, -1), )*self.GD
+            for n, hd in zip(self.n, h):
+                xi.append(np.pi*np.arange(1, n + 1)/((n + 1)*hd))
+        # 第 d 个方向的波数, 形状可以与谱系数广播
+        self.xi = []
+        for d, k in enumerate(xi):
+            s = [1]*self.GD
+            s[d] = len(k)
+            self.xi.append(k.reshape(s))
+        self._propagators = {}
+
+    def forward(self, uh):
+        """
+        @brief 节点值 -> 谱系数, uh 的形状为 (..., ) + mesh.function().shape
+        """
+        v = uh[(Ellipsis, ) + self.index]
+        if self.bc == 'periodic':
+            return fft.rfftn(v, axes=self.axes, workers=self.workers)
+        return fft.dstn(v, type=1, axes=self.axes, workers=self.workers)
+
+    def backward(self, U, out=None):
+        """
+        @brief 谱系数 -> 节点值, 写入 out (默认分配新数组)
+        """
+        if self.bc == 'periodic':
+            v = fft.irfftn(U, s=self.n, axes=self.axes, workers=self.workers)
+        else:
+            v = fft.idstn(U, type=1, axes=self.axes, workers=self.workers)
+        if out is None:
+            out = np.zeros(U.shape[:U.ndim-self.GD] + self.shape, dtype=v.dtype)
+        out[(Ellipsis, ) + self.index] = v
+        for d in range(self.GD):
+            first = [slice(None)]*self.GD
+            last = [slice(None)]*self.GD
+            first[d], last[d] = 0, -1
+            first = (Ellipsis, ) + tuple(first)
+            last = (Ellipsis, ) + tuple(last)
+            if self.bc == 'periodic':
+                out[last] = out[first]
+            else:
+                out[first] = 0.0
+                out[last] = 0.0
+        return out
+
+    def symbol(self, a=0.0, k=0.0):
+        """
+        @brief 算子 -a·∇ + k Δ 的符号
+
+        @param[in] a float 或 tuple, 对流速度
+        @param[in] k float, 扩散系数
+        """
+        a = np.broadcast_to(np.asarray(a, dtype=np.float64), (self.GD, ))
+        if self.bc == 'dirichlet' and np.any(a != 0):
+            raise ValueError("Advection is not diagonal in the sine basis")
+        lam = 0.0
+        for d, xi in enumerate(self.xi):
+            lam = lam - k*xi**2
+            if a[d] != 0:
+                # 偶数个点时 Nyquist 频率的一阶导数取零, 保持逆变换为实数
+                xo = xi.copy()
+                if self.n[d] % 2 == 0 and d < self.GD - 1:
+                    xo.flat[self.n[d]//2] = 0.0
+                elif self.n[d] % 2 == 0:
+                    xo.flat[-1] = 0.0
+                lam = lam - 1j*a[d]*xo
+        return lam
+
+    def propagator(self, tau, a=0.0, k=0.0):
+        """
+        @brief 指数传播子 exp(lambda*tau), 按 (tau, a, k) 缓存
+        """
+        key = ('exp', tau, tuple(np.broadcast_to(a, (self.GD, ))), k)
+        if key not in self._propagators:
+            self._propagators[key] = np.exp(self.symbol(a, k)*tau)
+        return self._propagators[key]
+
+    def etd_weights(self, tau, a=0.0, k=0.0, M=32):
+        """
+        @brief 三点 (t, t + tau/2, t + tau) 的指数积分权, 按 (tau, a, k) 缓存
+
+        用二次插值多项式代替右端项, 精确计算 Duhamel 积分
+            int_0^tau exp(lambda (tau - s)) f(t + s) ds
+        权为 tau*(phi1 - 3 phi2 + 4 phi3), tau*(4 phi2 - 8 phi3), tau*(4 phi3 - phi2),
+        phi_j(z) 在 z = lambda*tau 很小时有严重的相消, 按 Kassam-Trefethen
+        取以 z 为圆心的单位圆周上 M 个点的平均.
+        """
+        key = ('etd', tau, tuple(np.broadcast_to(a, (self.GD, ))), k)
+        if key not in self._propagators:
+            z = self.symbol(a, k)*tau
+            r = np.exp(1j*np.pi*(np.arange(1, M + 1) - 0.5)/M)
+            w = np.expand_dims(z, -1) + r
+            ew = np.exp(w)
+            phi1 = np.mean((ew - 1)/w, axis=-1)
+            phi2 = np.mean((ew - 1 - w)/w**2, axis=-1)
+            phi3 = np.mean((ew - 1 - w - w**2/2)/w**3, axis=-1)
+            W = (phi1 - 3*phi2 + 4*phi3, 4*phi2 - 8*phi3, 4*phi3 - phi2)
+            if np.isrealobj(z):
+                W = tuple(np.real(c) for c in W)
+            self._propagators[key] = tuple(tau*c for c in W)
+        return self._propagators[key]
+
+class SpectralIntegrator(TimeIntegrator):
+    """
+    @brief 周期 (或齐次 Dirichlet) 问题 u_t + a·∇u = k Δu + f 的 Fourier 谱方法
+
+    空间为谱精度. 没有右端项时每一步只把谱系数乘以 exp(lambda*tau),
+    时间上是精确的, 步数只决定输出的时刻. 有右端项时线性部分仍精确积分,
+    右端项与 u 无关, RK4 型的三点公式化为 Duhamel 积分的求积
+        U^{n+1} = E U^n + w0 F(t) + w1 F(t + tau/2) + w2 F(t + tau)
+    积分因子 RK4 的权 tau/6 (E, 4 E^{1/2}, 1) 相当于 Simpson 公式, 在
+    |lambda*tau| 较大的刚性模态上误差很大; 这里用指数时间差分 (ETD-RK4)
+    的权 (见 FourierSpectral.etd_weights), 对指数因子精确积分,
+    lambda*tau 很小时与积分因子 RK4 一致.
+    """
+    def __init__(self, mesh, pde, nt=None, a=None, k=0.0, bc='periodic', workers=None):
+        """
+        @param[in] nt int, 时间步数, 为 None 时只推进一步, 要求 PDE 没有右端项或声明右端项恒为零
+        @param[in] a float 或 tuple, 对流速度, 默认取 pde.a(), 没有时为 0
+        @param[in] k float, 扩散系数
+        @param[in] bc str, 'periodic' 或 'dirichlet' (齐次)
+        """
+        if a is None:
+            a = pde.a() if hasattr(pde, 'a') else 0.0
+        self.transform = FourierSpectral(mesh, bc=bc, workers=workers)
+        self.a = a
+        self.k = k
+        super().__init__(mesh, pde, 1 if nt is None else nt)
+        self.has_source = self._has_source()
+        if nt is None and self.has_source:
+            raise ValueError("nt is needed unless separable() declares the source as 0")
+        if bc == 'dirichlet' and not np.allclose(self.dirichlet(self.t0), 0.0, atol=1e-12):
+            raise ValueError("Only homogeneous Dirichlet boundary is supported")
+        self.E = self.transform.propagator(self.tau, a, k)
+        if self.has_source:
+            self.W = self.transform.etd_weights(self.tau, a, k)
+        self.F = None
+        self.U = None
+
+    def _has_source(self):
+        """
+        @brief 右端项是否可能不为零, 只有 PDE 没有右端项或声明为恒为零时返回 False
+        """
+        return hasattr(self.pde, 'source') and not self.exact.is_zero('source')
+
+    def source_hat(self, t):
+        """
+        @brief 右端项的谱系数
+        """
+        return self.transform.forward(self.source(t, out=self._f).reshape(self.uh.shape))
+
+    def initialize(self):
+        super().initialize()
+        self.U = self.transform.forward(self.uh)
+        if self.has_source and self.exact.is_time_invariant('source'):
+            # 右端项与时间无关时三个权之和就是精确的 Duhamel 积分, 谱系数只算一次
+            self.F = sum(self.W)*self.source_hat(self.t0)
+
+    def step(self, n):
+        U = self.U
+        U *= self.E
+        if self.F is not None:
+            U += self.F
+        elif self.has_source:
+            t = self.t0 + n*self.tau
+            for w, s in zip(self.W, [t, t + self.tau/2, t + self.tau]):
+                U += w*self.source_hat(s)
+        self.transform.backward(U, out=self.uh)
+
+
+if __name__ == '__main__':
+    from fealpy.mesh import UniformMesh1d, UniformMesh2d
+    from fealpy.pde.parabolic_1d import SinExpPDEData
+    from fealpy.pde.parabolic_2d import SinSinExpPDEData
+
+    class Hyperbolic1dPDEData:
+        """
+        @brief Wilbur_hyperbolic 中的算例, u_t - 2 u_x = 0, a = -2
+        """
+        def __init__(self, D=[0, 1], T=[0, 1]):
+            self._domain = D
+            self._duration = T
+
+        def domain(self):
+            return self._domain
+
+        def duration(self):
+            return self._duration
+
+        def solution(self, p, t):
+            return 1 + np.sin(2*np.pi*(p + 2*t))
+
+        def init_solution(self, p):
+            return 1 + np.sin(2*np.pi*p)
+
+        def source(self, p, t):
+            return np.zeros_like(p)
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+        def separable(self):
+            return {'source': 0}
+
+        def a(self):
+            return -2
+
+    # 对流: error_a.py 用 nx = 100, nt = 800, 这里 16 个节点一步到终止时刻
+    pde = Hyperbolic1dPDEData()
+    nx = 16
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    integrator = SpectralIntegrator(mesh, pde)
+    for t, uh in integrator.steps():
+        pass
+    solution = lambda p: pde.solution(p, t)
+    print(f"advection nx = {nx}, nt = {integrator.nt}: max error {mesh.error(solution, uh, errortype='max'):.3e}")
+
+    # 带右端项的热方程: 空间谱精度, 时间上对右端项做三点指数求积
+    pde = SinExpPDEData()
+    nx = 16
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    e0 = None
+    for nt in [5, 10, 20, 40]:
+        integrator = SpectralIntegrator(mesh, pde, nt, k=1.0)
+        for t, uh in integrator.steps():
+            pass
+        e = mesh.error(lambda p: pde.solution(p, t), uh, errortype='max')
+        order = "" if e0 is None else f", order {np.log2(e0/e):.2f}"
+        print(f"heat with source nx = {nx}, nt = {nt}: max error {e:.3e}{order}")
+        e0 = e
+
+    # 二维齐次 Dirichlet 边界, 正弦变换
+    pde = SinSinExpPDEData(T=[0, 0.1])
+    nx = ny = 8
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(1/nx, 1/ny), origin=(0, 0))
+    # 右端项为零但没有声明分离变量形式, 给定 nt = 1 一步到终止时刻
+    integrator = SpectralIntegrator(mesh, pde, nt=1, k=1.0, bc='dirichlet')
+    for t, uh in integrator.steps():
+        pass
+    solution = lambda p: pde.solution(p, t)
+    print(f"2d heat nx = ny = {nx}: max error {mesh.error(solution, uh, errortype='max'):.3e}")
+
+    # 批量变换: 一次推进多个初值
+    mesh = UniformMesh1d([0, 64], h=1/64, origin=0)
+    x = mesh.entity('node')
+    transform = FourierSpectral(mesh)
+    U0 = np.stack([np.sin(2*np.pi*m*x) for m in range(1, 5)])
+    U1 = transform.backward(transform.forward(U0)*transform.propagator(0.25, a=-2, k=0.01))
+    exact = np.stack([np.exp(-0.01*(2*np.pi*m)**2*0.25)*np.sin(2*np.pi*m*(x + 0.5))
+        for m in range(1, 5)])
+    print(f"batched transform of {len(U0)} functions: max error {np.max(np.abs(U1 - exact)):.3e}")
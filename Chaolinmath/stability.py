@@ -0,0 +1,151 @@
+import numpy as np
+
+# 各格式的时间精度阶数
+ORDER = {
+        'forward': 1,
+        'backward': 1,
+        'crank_nicholson': 2,
+        'wave_explicit': 2,
+        'wave_implicit': 2,
+        'upwind': 1,
+        'lax_friedrichs': 1,
+        'lax_wendroff': 2,
+        }
+
+# 与 explicit_stencil 中的格式名对应
+ALIASES = {'parabolic_forward': 'forward'}
+
+HYPERBOLIC = ('upwind', 'lax_friedrichs', 'lax_wendroff')
+
+def mesh_steps(mesh):
+    """
+    @brief 每个方向的网格步长, 一维为 (hx, ), 二维为 (hx, hy)
+    """
+    if hasattr(mesh, 'ny'):
+        return np.broadcast_to(np.asarray(mesh.h, dtype=np.float64), (2, ))
+    return np.array([mesh.h], dtype=np.float64)
+
+def max_speed(mesh, a):
+    """
+    @brief 每个方向上系数绝对值的最大值
+
+    @param[in] a 标量; 每个方向一个值的 tuple (二维对流速度);
+               节点上的数组, 或函数 a(p) (变系数, 取最大值)
+    """
+    GD = len(mesh_steps(mesh))
+    if callable(a):
+        a = a(mesh.entity('node'))
+    a = np.abs(np.asarray(a, dtype=np.float64))
+    if a.ndim == 0 or a.shape == (GD, ):
+        return np.broadcast_to(a, (GD, ))
+    if a.shape[-1] == GD and a.ndim > GD:
+        return np.max(a.reshape(-1, GD), axis=0)
+    return np.full(GD, np.max(a))
+
+def max_stable_tau(mesh, scheme, a=1.0, k=1.0, theta=0.0):
+    """
+    @brief 给定网格和系数时格式稳定的最大时间步长, 无条件稳定时返回 np.inf
+
+    @param[in] mesh UniformMesh1d 或 UniformMesh2d, 二维时允许 hx != hy
+    @param[in] scheme str, 格式名, 见 ORDER
+    @param[in] a 对流速度或波速, 可以是变系数 (见 max_speed)
+    @param[in] k float, 热传导系数
+    @param[in] theta float, 波动方程 theta 格式的参数
+
+    抛物方程向前欧拉: k*tau*sum(1/h^2) <= 1/2
+    波动方程 theta 格式: theta >= 1/4 无条件稳定, 否则
+        tau^2*sum(a^2/h^2)*(1 - 4*theta) <= 1
+    对流方程, r = |a|*tau/h, 一维时三个格式都是 |r| <= 1; 二维 (不分裂) 时
+        迎风: rx + ry <= 1
+        Lax-Friedrichs: rx^2 + ry^2 <= 1/2
+        Lax-Wendroff: 没有混合导数项时对任何 tau 都不稳定, 抛出 ValueError,
+            需要维数分裂 (每个方向按一维格式 |r| <= 1)
+    以上均与 amplification.von_neumann_radius 给出的 von Neumann 条件一致.
+    """
+    scheme = ALIASES.get(scheme, scheme)
+    h = mesh_steps(mesh)
+    if scheme == 'forward':
+        return 1/(2*k*np.sum(1/h**2))
+    elif scheme in ('backward', 'crank_nicholson'):
+        return np.inf
+    elif scheme in ('wave_explicit', 'wave_implicit'):
+        if scheme == 'wave_explicit':
+            theta = 0.0
+        c = (1 - 4*theta)*np.sum(max_speed(mesh, a)**2/h**2)
+        return np.inf if c <= 0 else 1/np.sqrt(c)
+    elif scheme in HYPERBOLIC:
+        c = max_speed(mesh, a)/h
+        if scheme == 'upwind':
+            c = np.sum(c)
+        elif scheme == 'lax_friedrichs':
+            c = np.sqrt(len(h)*np.sum(c**2))
+        elif len(h) > 1:
+            raise ValueError("The unsplit Lax-Wendroff scheme is unstable in 2d for every tau, "
+                             "use dimensional splitting")
+        else:
+            c = c[0]
+        return np.inf if c == 0 else 1/c
+    else:
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+def check_stability(mesh, scheme, tau, a=1.0, k=1.0, theta=0.0):
+    """
+    @brief 时间步长超过稳定性限制时抛出 ValueError
+    """
+    tau_max = max_stable_tau(mesh, scheme, a=a, k=k, theta=theta)
+    # 恰好取在稳定性限制上的步长不应因舍入误差而报错
+    if tau > tau_max*(1 + 1e-12):
+        raise ValueError(f"The tau: {tau} of {scheme} should be smaller than {tau_max}")
+
+def choose_nt(mesh, scheme, duration, a=1.0, k=1.0, theta=0.0, safety=1.0, tol=None):
+    """
+    @brief 选取既稳定又满足精度要求的最少时间步数
+
+    @param[in] duration list, [t0, t1]
+    @param[in] safety float, 稳定性限制的安全系数, tau <= safety*max_stable_tau
+    @param[in] tol float, 时间离散误差 tau^p 的目标 (p 为格式的阶数), 默认取空间
+               离散误差 max(h)^2, 使时间误差与空间误差同阶, 不过度加密时间;
+               对流方程的格式时空同阶, 默认只受稳定性限制
+
+    @return nt
+    """
+    scheme = ALIASES.get(scheme, scheme)
+    T = duration[1] - duration[0]
+    tau = safety*max_stable_tau(mesh, scheme, a=a, k=k, theta=theta)
+    if tol is None and scheme not in HYPERBOLIC:
+        tol = np.max(mesh_steps(mesh))**2
+    if tol is not None:
+        tau = min(tau, tol**(1/ORDER[scheme]))
+    return max(1, int(np.ceil(T/tau*(1 - 1e-12))))
+
+
+if __name__ == '__main__':
+    from fealpy.mesh import UniformMesh2d
+
+    nx, ny = 40, 20
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(1/nx, 1/ny), origin=(0, 0))
+    duration = [0, 0.1]
+    print(f"{'scheme':<16} {'theta':>6} {'max tau':>12} {'nt':>6}")
+    for scheme, theta in [('forward', 0), ('backward', 0), ('crank_nicholson', 0),
+            ('wave_explicit', 0), ('wave_implicit', 0.1), ('wave_implicit', 0.25),
+            ('upwind', 0), ('lax_friedrichs', 0)]:
+        tau = max_stable_tau(mesh, scheme, a=(1.0, -2.0), theta=theta)
+        nt = choose_nt(mesh, scheme, duration, a=(1.0, -2.0), theta=theta)
+        print(f"{scheme:<16} {theta:6.2f} {tau:12.4e} {nt:6d}")
+
+    # 二维时与 von Neumann 分析比较: 取在稳定性限制上谱半径不超过 1, 再放大 5% 就超过 1
+    from amplification import von_neumann_radius
+    h = mesh_steps(mesh)
+    for scheme in ['upwind', 'lax_friedrichs']:
+        for a in [(1.0, 0.0), (0.7, 0.3), (1.0, -2.0)]:
+            tau = max_stable_tau(mesh, scheme, a=a)
+            rho = [von_neumann_radius(scheme, tuple(float(v) for v in np.array(a)*c*tau/h))
+                    for c in [1.0, 1.05]]
+            print(f"{scheme:<16} a = {a}: rho = {rho[0]:.6f} at max tau, {rho[1]:.6f} at 1.05 max tau")
+            assert rho[0] <= 1 + 1e-8 and rho[1] > 1, f"{scheme}: max_stable_tau disagrees with von Neumann"
+    try:
+        max_stable_tau(mesh, 'lax_wendroff', a=(1.0, -2.0))
+    except ValueError as e:
+        print("lax_wendroff:", e)
+    else:
+        raise AssertionError("the unsplit 2d Lax-Wendroff scheme should be refused")
@@ -0,0 +1,322 @@
+import tracemalloc
+import numpy as np
+from condensation import DirichletCondensation, INPLACE_MATVEC, csr_matvec
+from explicit_stencil import explicit_operator
+from separable_cache import ExactSolutionCache
+from stability import choose_nt
+from tvd import LIMITERS, TVDOperator
+
+class TimeIntegrator:
+    """
+    @brief 时间推进的基类
+
+    每个对象自己保存网格、PDE 数据、时间步长和解的数组, 不依赖模块全局变量.
+    steps() 是惰性的生成器, 依次给出 (t, uh), 所有后续处理 (画图、误差、
+    输出文件) 都在同一遍推进中完成, 例如
+        for t, uh in integrator.steps():
+            ...
+    给出的 uh 是内部数组的只读视图, 下一步会被覆盖, 需要保留时请复制.
+
+    所有工作数组在构造时分配, 稀疏矩阵乘向量直接写入工作数组, 多个时间层
+    轮换使用同一组数组, 因此推进过程中不再分配新的数组 (见 allocated_bytes).
+    scipy 不提供底层 csr_matvec 时退回公开的 A@x, 每次乘法会分配临时数组.
+    例外: 右端项没有声明分离变量形式时 mesh.interpolate 会分配数组,
+    二维隐格式的稀疏 LU 回代也会返回新数组.
+    """
+    def __init__(self, mesh, pde, nt):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] pde PDE 数据对象
+        @param[in] nt int, 时间步数
+        """
+        self.mesh = mesh
+        self.pde = pde
+        self.nt = nt
+        self.t0, self.t1 = pde.duration()
+        self.tau = (self.t1 - self.t0)/nt
+
+        node = mesh.entity('node')
+        self.node = node if node.ndim == 1 else node.reshape(-1, node.shape[-1])
+        self.isBdNode = mesh.ds.boundary_node_flag()
+        self.bdIdx = np.nonzero(self.isBdNode)[0]
+        self.exact = ExactSolutionCache(mesh, pde)
+        self._views = {}
+        self.uh = self.new_buffer()
+        self._f = mesh.function().reshape(-1)
+        self._w = mesh.function().reshape(-1)
+        self._gb = np.zeros(len(self.bdIdx), dtype=mesh.ftype)
+        self._steps = None
+
+    def new_buffer(self):
+        """
+        @brief 分配一个节点数组, 并预先生成它的只读视图
+        """
+        buf = self.mesh.function()
+        view = buf.view()
+        view.flags.writeable = False
+        self._views[id(buf)] = view
+        return buf
+
+    def source(self, t, out=None):
+        """
+        @brief 节点上的右端项 (展平), PDE 数据声明了分离变量形式时使用缓存
+        """
+        if out is None:
+            return self.exact.source(t).reshape(-1)
+        self.exact.source(t, out=out.reshape(self.uh.shape))
+        return out
+
+    def dirichlet(self, t):
+        """
+        @brief 边界节点上的 Dirichlet 边界值, 写入预先分配的数组
+        """
+        return self.exact.dirichlet(t, out=self._gb)
+
+    def add_source(self, f, t, c):
+        """
+        @brief f += c*source(t), 右端项声明为零时什么都不做
+        """
+        if not self.exact.is_zero('source'):
+            w = self.source(t, out=self._w)
+            w *= c
+            f += w
+        return f
+
+    def implicit_solver(self, A):
+        """
+        @brief 对 A 做 Dirichlet 边界节点的静态凝聚, 只分解一次内部块
+
+        @return DirichletCondensation, 用 solve(f, gb, out) 求解
+        """
+        return DirichletCondensation(A, self.isBdNode)
+
+    def initialize(self):
+        """
+        @brief 设置初值
+        """
+        self.uh[:] = self.mesh.interpolate(self.pde.init_solution, 'node')
+
+    def step(self, n):
+        """
+        @brief 从第 n 层推进到第 n+1 层, 结果在 self.uh 中
+        """
+        raise NotImplementedError
+
+    def steps(self):
+        """
+        @brief 时间推进的生成器, 依次给出 (t, uh), 包括初始时刻
+        """
+        self.initialize()
+        yield self.t0, self._views[id(self.uh)]
+        for n in range(self.nt):
+            self.step(n)
+            yield self.t0 + (n+1)*self.tau, self._views[id(self.uh)]
+
+    def advance(self, n, *fargs):
+        """
+        @brief 与 mesh.show_animation 兼容的推进函数, 返回 (uh, t)
+        """
+        if n == 0 or self._steps is None:
+            self._steps = self.steps()
+        t, uh = next(self._steps)
+        return uh, t
+
+class ParabolicIntegrator(TimeIntegrator):
+    """
+    @brief 抛物方程 u_t - Δu = f 的向前欧拉、向后欧拉和 Crank-Nicholson 格式
+
+    矩阵在构造时组装并分解一次, 每一步只做回代.
+    """
+    def __init__(self, mesh, pde, nt, scheme='crank_nicholson'):
+        """
+        @param[in] nt int, 时间步数, 为 None 时用 stability.choose_nt 自动选取
+        @param[in] scheme str, 'forward', 'backward' 或 'crank_nicholson'
+        """
+        if nt is None:
+            nt = choose_nt(mesh, scheme, pde.duration())
+        super().__init__(mesh, pde, nt)
+        self.scheme = scheme
+        tau = self.tau
+        if scheme == 'forward':
+            self.A = mesh.parabolic_operator_forward(tau).tocsr()
+        elif scheme == 'backward':
+            self.A = mesh.parabolic_operator_backward(tau).tocsr()
+            self.bc = self.implicit_solver(self.A)
+        elif scheme == 'crank_nicholson':
+            A, B = mesh.parabolic_operator_crank_nicholson(tau)
+            self.A = A.tocsr()
+            self.B = B.tocsr()
+            self.bc = self.implicit_solver(self.A)
+        else:
+            raise ValueError(f"Unknown scheme: {scheme}")
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        tau = self.tau
+        uh = self.uh.reshape(-1)
+        f = self._f
+        gb = self.dirichlet(t + tau)
+        if self.scheme == 'forward':
+            csr_matvec(self.A, uh, f)
+            self.add_source(f, t, tau)
+            np.put(f, self.bdIdx, gb)
+            uh[:] = f
+            return
+
+        if self.scheme == 'backward':
+            f[:] = uh
+            self.add_source(f, t + tau, tau)
+        else:
+            csr_matvec(self.B, uh, f)
+            self.add_source(f, t, tau/2)
+            self.add_source(f, t + tau, tau/2)
+        self.bc.solve(f, gb, out=uh)
+
+class WaveIntegrator(TimeIntegrator):
+    """
+    @brief 波动方程 u_tt - a^2 Δu = f 的 theta 格式, theta = 0 时为显格式
+
+    self.uh0, self.uh, self.uh2 为上一层、当前层和下一层, 每一步之后
+    只轮换三个数组的引用, 不复制数据.
+    """
+    def __init__(self, mesh, pde, nt, a=1, theta=0.25):
+        """
+        @param[in] a float, 波速
+        @param[in] theta float, 隐式格式的参数
+        """
+        if nt is None:
+            scheme = 'wave_explicit' if theta == 0.0 else 'wave_implicit'
+            nt = choose_nt(mesh, scheme, pde.duration(), a=a, theta=theta)
+        super().__init__(mesh, pde, nt)
+        self.a = a
+        self.theta = theta
+        self.uh0 = self.new_buffer()
+        self.uh2 = self.new_buffer()
+        if theta == 0.0:
+            self.A = mesh.wave_operator_explicit(self.tau, a).tocsr()
+        else:
+            A0, A1, A2 = mesh.wave_operator_implicit(self.tau, a, theta)
+            self.A0 = A0.tocsr()
+            self.A1 = A1.tocsr()
+            self.A2 = A2.tocsr()
+            self.bc = self.implicit_solver(self.A0)
+
+    def initialize(self):
+        self.uh0[:] = self.mesh.interpolate(self.pde.init_solution, 'node')
+        self.uh[:] = self.uh0
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        tau = self.tau
+        uh0 = self.uh0.reshape(-1)
+        uh1 = self.uh.reshape(-1)
+        uh2 = self.uh2.reshape(-1)
+        if n == 0:
+            # 第一层用 Taylor 展开 u(tau) = u0 + tau*v0 + tau^2/2*(a^2 Δu0 + f0)
+            L = self.mesh.laplace_operator()
+            vh0 = self.mesh.interpolate(self.pde.init_solution_diff_t, 'node').reshape(-1)
+            uh2[:] = uh0 + tau*vh0 + tau**2/2*(-self.a**2*(L@uh0) + self.source(t))
+            np.put(uh2, self.bdIdx, self.dirichlet(t + tau))
+        elif self.theta == 0.0:
+            csr_matvec(self.A, uh1, uh2)
+            uh2 -= uh0
+            self.add_source(uh2, t, tau**2)
+            np.put(uh2, self.bdIdx, self.dirichlet(t + tau))
+        else:
+            f = self._f
+            csr_matvec(self.A1, uh1, f)
+            f += csr_matvec(self.A2, uh0, self._w)
+            self.add_source(f, t, tau**2)
+            self.bc.solve(f, self.dirichlet(t + tau), out=uh2)
+        # 轮换时间层: uh0 <- uh1, uh1 <- uh2, 原来的 uh0 作为下一步的 uh2
+        self.uh0, self.uh, self.uh2 = self.uh, self.uh2, self.uh0
+
+class HyperbolicIntegrator(TimeIntegrator):
+    """
+    @brief 一维对流方程 u_t + a u_x = 0 的显格式
+
+    入流边界取 Dirichlet 边界值, 出流边界用线性外推.
+    """
+    def __init__(self, mesh, pde, nt, scheme='upwind'):
+        """
+        @param[in] scheme str, 'upwind', 'lax_friedrichs', 'lax_wendroff',
+                   或通量限制器名 'minmod', 'van_leer', 'superbee', 'mc' (TVD 格式)
+        """
+        if nt is None:
+            nt = choose_nt(mesh, 'upwind' if scheme in LIMITERS else scheme,
+                    pde.duration(), a=pde.a())
+        super().__init__(mesh, pde, nt)
+        self.a = pde.a()
+        if scheme in LIMITERS:
+            self.A = TVDOperator(mesh, self.tau, self.a, limiter=scheme)
+        else:
+            self.A = explicit_operator(mesh, scheme, self.tau, a=self.a)
+        self.uh1 = self.new_buffer()
+
+    def step(self, n):
+        t = self.t0 + (n+1)*self.tau
+        uh = self.A.matvec(self.uh, out=self.uh1)
+        if self.a > 0:
+            uh[0] = self.pde.dirichlet(self.node[0], t)
+            uh[-1] = 2*uh[-2] - uh[-3]
+        else:
+            uh[-1] = self.pde.dirichlet(self.node[-1], t)
+            uh[0] = 2*uh[1] - uh[2]
+        self.uh, self.uh1 = self.uh1, self.uh
+
+def allocated_bytes(integrator, nwarm=3, nsteps=20):
+    """
+    @brief 用 tracemalloc 统计稳定推进阶段额外占用内存的峰值 (字节)
+
+    先推进 nwarm 步 (包括第一层等只做一次的准备工作), 再统计之后 nsteps 步
+    内存峰值与起点之差. 不分配数组时结果只有 Python 对象的几百字节,
+    远小于一个节点数组的大小.
+    """
+    steps = integrator.steps()
+    for _ in range(nwarm):
+        next(steps)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    for _ in range(nsteps):
+        next(steps)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+    from fealpy.pde.wave_1d import StringOscillationSinCosPDEData
+    from fealpy.mesh import UniformMesh1d
+
+    pde = StringOscillationSinCosPDEData()
+    domain = pde.domain()
+    nx = 100
+    hx = (domain[1] - domain[0])/nx
+    mesh = UniformMesh1d([0, nx], h=hx, origin=domain[0])
+
+    # 两个求解器在同一个进程中, 各自保存自己的状态
+    explicit = WaveIntegrator(mesh, pde, nt=1000, theta=0.0)
+    implicit = WaveIntegrator(mesh, pde, nt=1000, theta=0.25)
+
+    x = mesh.entity('node')
+    fig, axes = plt.subplots()
+    for (t, u0), (_, u1) in zip(explicit.steps(), implicit.steps()):
+        if np.isclose(t, 0.5):
+            axes.plot(x, u0, label='explicit')
+            axes.plot(x, u1, '--', label='implicit')
+            axes.plot(x, pde.solution(x, t), ':', label='exact')
+    print("explicit error:", mesh.error(lambda p: pde.solution(p, t), u0))
+    print("implicit error:", mesh.error(lambda p: pde.solution(p, t), u1))
+
+    # 稳定推进阶段不分配数组: 额外内存峰值必须小于一个节点数组
+    for integrator in [explicit, implicit]:
+        nbytes = allocated_bytes(integrator)
+        print(f"theta = {integrator.theta}: {nbytes} bytes, "
+              f"one array is {integrator.uh.nbytes} bytes")
+        if INPLACE_MATVEC:
+            assert nbytes < integrator.uh.nbytes, \
+                f"theta = {integrator.theta}: time stepping allocated {nbytes} bytes"
+    axes.legend()
+    plt.show()
@@ -0,0 +1,157 @@
+import numpy as np
+from scipy.sparse import diags
+from scipy.linalg.lapack import dgttrf, dgttrs
+
+class TridiagonalMatrix:
+    """
+    @brief 三对角矩阵, 只存储下对角线、主对角线和上对角线
+
+    一维均匀网格上的向后欧拉、CN 和隐式波动方程格式的矩阵都是三对角的,
+    用 LAPACK 的 gttrf/gttrs 分解一次后, 每一步只需要 O(n) 的前代和回代,
+    并且可以一次求解多个右端项.
+    """
+    def __init__(self, lower, diag, upper):
+        """
+        @brief 初始化函数
+
+        @param[in] lower numpy.ndarray, 长度 n-1, lower[i] = A[i+1, i]
+        @param[in] diag numpy.ndarray, 长度 n, diag[i] = A[i, i]
+        @param[in] upper numpy.ndarray, 长度 n-1, upper[i] = A[i, i+1]
+        """
+        self.lower = np.array(lower, dtype=np.float64)
+        self.diag = np.array(diag, dtype=np.float64)
+        self.upper = np.array(upper, dtype=np.float64)
+        self.shape = (len(self.diag), len(self.diag))
+        self._lu = None
+
+    @staticmethod
+    def is_tridiagonal(A):
+        """
+        @brief 判断 scipy 稀疏矩阵的非零元是否都在三条对角线上
+        """
+        A = A.tocoo()
+        return not np.any((np.abs(A.row - A.col) > 1) & (A.data != 0))
+
+    @classmethod
+    def from_sparse(cls, A):
+        """
+        @brief 从 scipy 稀疏矩阵转换, 要求矩阵是三对角的
+        """
+        if not cls.is_tridiagonal(A):
+            raise ValueError("The matrix is not tridiagonal")
+        A = A.tocsr()
+        return cls(A.diagonal(-1), A.diagonal(0), A.diagonal(1))
+
+    def tocsr(self):
+        return diags([self.lower, self.diag, self.upper], [-1, 0, 1], format='csr')
+
+    def matvec(self, u, out=None):
+        """
+        @brief 计算 A@u, u 的形状可以是 (n, ) 或 (n, k)
+        """
+        if out is None:
+            out = np.empty_like(u, dtype=np.float64)
+        l = self.lower if u.ndim == 1 else self.lower[:, None]
+        d = self.diag if u.ndim == 1 else self.diag[:, None]
+        r = self.upper if u.ndim == 1 else self.upper[:, None]
+        np.multiply(d, u, out=out)
+        out[1:] += l*u[:-1]
+        out[:-1] += r*u[1:]
+        return out
+
+    def __matmul__(self, u):
+        return self.matvec(u)
+
+    def apply_dirichlet_bc(self, isBdNode):
+        """
+        @brief 与 mesh.apply_dirichlet_bc 相同的矩阵处理: 边界节点所在的行和列置零, 对角元置一
+
+        @param[in] isBdNode numpy.ndarray, 边界节点标记
+
+        @return 新的三对角矩阵
+        """
+        mask = isBdNode[:-1] | isBdNode[1:]
+        lower = np.where(mask, 0.0, self.lower)
+        upper = np.where(mask, 0.0, self.upper)
+        diag = np.where(isBdNode, 1.0, self.diag)
+        return TridiagonalMatrix(lower, diag, upper)
+
+    def factorize(self):
+        """
+        @brief LU 分解 (带部分选主元), 结果保存在矩阵中
+        """
+        dl, d, du, du2, ipiv, info = dgttrf(self.lower, self.diag, self.upper)
+        if info != 0:
+            raise np.linalg.LinAlgError(f"The matrix is singular, info = {info}")
+        self._lu = (dl, d, du, du2, ipiv)
+        return self
+
+    def solve(self, b, overwrite_b=False):
+        """
+        @brief 求解 A x = b
+
+        @param[in] b numpy.ndarray, 形状为 (n, ) 或 (n, k), 后者一次求解 k 个右端项
+        @param[in] overwrite_b bool, 为 True 时解直接写入 b (b 为连续的 float64 数组时), 不分配新数组
+
+        @return 与 b 形状相同的解
+        """
+        if self._lu is None:
+            self.factorize()
+        x, info = dgttrs(*self._lu, b, overwrite_b=overwrite_b)
+        if info != 0:
+            raise ValueError(f"Illegal argument in gttrs, info = {info}")
+        return x
+
+
+def tridiagonal_operator(mesh, scheme, tau, **kwargs):
+    """
+    @brief 生成一维隐格式的三对角矩阵
+
+    @param[in] mesh UniformMesh1d, 网格
+    @param[in] scheme str, 'backward', 'crank_nicholson' 或 'wave_implicit'
+    @param[in] tau float, 时间步长
+    @param[in] kwargs 传给 wave_operator_implicit 的参数, 如 a, theta
+
+    @return 左端三对角矩阵, 以及右端矩阵 (向后欧拉没有右端矩阵, CN 一个, 波动方程两个)
+    """
+    if scheme == 'backward':
+        A = mesh.parabolic_operator_backward(tau)
+        return TridiagonalMatrix.from_sparse(A), ()
+    elif scheme == 'crank_nicholson':
+        A, B = mesh.parabolic_operator_crank_nicholson(tau)
+        return TridiagonalMatrix.from_sparse(A), (TridiagonalMatrix.from_sparse(B), )
+    elif scheme == 'wave_implicit':
+        A0, A1, A2 = mesh.wave_operator_implicit(tau, **kwargs)
+        return TridiagonalMatrix.from_sparse(A0), (
+                TridiagonalMatrix.from_sparse(A1), TridiagonalMatrix.from_sparse(A2))
+    else:
+        raise ValueError(f"Unknown scheme: {scheme}")
+
+
+if __name__ == '__main__':
+    import time
+    from scipy.sparse.linalg import spsolve
+    from fealpy.mesh import UniformMesh1d
+
+    nx = 200
+    mesh = UniformMesh1d([0, nx], h=1/nx, origin=0)
+    isBdNode = mesh.ds.boundary_node_flag()
+    node = mesh.entity('node')
+
+    # 与 spsolve 的结果比较
+    A, (B, ) = tridiagonal_operator(mesh, 'crank_nicholson', 1e-3)
+    T = A.apply_dirichlet_bc(isBdNode).factorize()
+    f = np.random.rand(nx+1)
+    _, f0 = mesh.apply_dirichlet_bc(lambda p: np.zeros_like(p), A.tocsr(), f.copy())
+    print("error:", np.max(np.abs(spsolve(T.tocsr().tocsc(), f0) - T.solve(f0))))
+
+    # 批量模式: 同时推进 k 个不同的初值, 每一步只做一次前代回代
+    k = 500
+    nt = 1000
+    uh = np.sin(np.pi*np.arange(1, k+1)[None, :]*node[:, None])
+    start = time.time()
+    for i in range(nt):
+        rhs = B@uh
+        rhs[isBdNode] = 0.0
+        uh = T.solve(rhs)
+    print(f"{k} initial values, {nt} steps: {time.time() - start:.3f}s")
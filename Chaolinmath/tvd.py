@@ -0,0 +1,214 @@
+import numpy as np
+
+def minmod(theta):
+    return np.maximum(0.0, np.minimum(1.0, theta))
+
+def van_leer(theta):
+    return (theta + np.abs(theta))/(1 + np.abs(theta))
+
+def superbee(theta):
+    return np.maximum(0.0, np.maximum(np.minimum(1.0, 2*theta), np.minimum(2.0, theta)))
+
+def mc(theta):
+    return np.maximum(0.0, np.minimum(np.minimum((1 + theta)/2, 2.0), 2*theta))
+
+# 通量限制器 phi(theta), theta 为迎风一侧与当前界面上差分之比
+LIMITERS = {
+        'minmod': minmod,
+        'van_leer': van_leer,
+        'superbee': superbee,
+        'mc': mc,
+        }
+
+class TVDOperator:
+    """
+    @brief 对流方程 u_t + a·∇u = 0 的通量限制 (TVD) 格式
+
+    节点 j 与 j+1 之间的数值通量为迎风通量加上限制后的 Lax-Wendroff 修正
+        F_{j+1/2} = a u_up + |a|/2 (1 - |r|) phi(theta_{j+1/2}) (u_{j+1} - u_j)
+    其中 r = a*tau/h, theta 为迎风一侧的差分与 u_{j+1} - u_j 之比 (a > 0 时取
+    u_j - u_{j-1}, a < 0 时取 u_{j+2} - u_{j+1}). phi = 0 时为迎风格式,
+    phi = 1 时为 Lax-Wendroff 格式; 对线性对流方程这与 MUSCL-Hancock 限制斜率
+    重构是同一个格式. 光滑区二阶精度, 间断和拐点附近不产生振荡.
+
+    二维时用 Strang 维数分裂, 每一步依次做 x 方向半步、y 方向一步、x 方向半步,
+    每次都是一维的 TVD 格式, 因此 max(|rx|, |ry|) <= 1 时稳定且不产生振荡
+    (两个方向的通量差直接求和的不分裂格式在 |rx| + |ry| <= 1 时仍会振荡甚至不稳定).
+    只更新内部节点, 与 mesh.hyperbolic_operator_* 的用法一样, 边界节点由调用方
+    按入流、出流边界条件设置; 与边界相邻的界面上没有迎风一侧的差分, 退化为迎风通量.
+    """
+    def __init__(self, mesh, tau, a, limiter='van_leer'):
+        """
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d
+        @param[in] tau float, 时间步长
+        @param[in] a float 或 tuple, 对流速度, 二维时可以每个方向不同
+        @param[in] limiter str, 'minmod', 'van_leer', 'superbee' 或 'mc'
+        """
+        if limiter not in LIMITERS:
+            raise ValueError(f"Unknown limiter: {limiter}")
+        if hasattr(mesh, 'ny'):
+            h = np.broadcast_to(mesh.h, (2, ))
+        else:
+            h = np.array([mesh.h])
+        self.GD = len(h)
+        self.a = np.broadcast_to(np.asarray(a, dtype=np.float64), (self.GD, ))
+        self.r = self.a*tau/h
+        if np.any(np.abs(self.r) > 1 + 1e-12):
+            raise ValueError(f"The mesh ratio a*tau/h: {self.r} of the TVD scheme "
+                             "should not exceed 1 in each direction")
+        self.phi = LIMITERS[limiter]
+
+    def flux_difference(self, uh, d, r=None):
+        """
+        @brief 第 d 个方向上 (F_{j+1/2} - F_{j-1/2})*tau/h, 只在内部节点上
+
+        @param[in] r float, 这个方向的网比, 默认为 self.r[d] (分裂的半步为其一半)
+
+        @return 形状比 uh 在第 d 个方向上少 2
+        """
+        a = self.a[d]
+        r = self.r[d] if r is None else r
+        du = np.diff(uh, axis=d)
+        # 两端补零: 与边界相邻的界面没有迎风一侧的差分, theta = 0
+        pad = [(0, 0)]*uh.ndim
+        pad[d] = (1, 1)
+        dp = np.pad(du, pad)
+        n = du.shape[d]
+        if a >= 0:
+            up = np.take(dp, range(0, n), axis=d)
+            uu = np.take(uh, range(0, n), axis=d)
+        else:
+            up = np.take(dp, range(2, n+2), axis=d)
+            uu = np.take(uh, range(1, n+1), axis=d)
+        theta = np.divide(up, du, out=np.zeros_like(du), where=du != 0)
+        # 乘以 tau/h 之后的通量
+        F = r*uu + np.abs(r)/2*(1 - np.abs(r))*self.phi(theta)*du
+        return np.diff(F, axis=d)
+
+    def matvec(self, uh, out=None):
+        """
+        @brief 推进一步, 边界节点的值保持不变
+        """
+        if out is None:
+            out = np.array(uh, dtype=np.float64)
+        else:
+            out[:] = uh
+        if self.GD == 1:
+            out[1:-1] -= self.flux_difference(uh, 0)
+            return out
+        # Strang 分裂: x 方向半步, y 方向一步, x 方向半步
+        for d, c in [(0, 0.5), (1, 1.0), (0, 0.5)]:
+            self.sweep(out, d, c*self.r[d])
+        return out
+
+    def sweep(self, uh, d, r):
+        """
+        @brief 沿第 d 个方向做一次一维的 TVD 更新, 结果写回 uh, 只更新内部节点
+        """
+        dF = self.flux_difference(uh, d, r=r)
+        # 去掉其它方向上的边界节点
+        index = [slice(1, -1)]*self.GD
+        index[d] = slice(None)
+        uh[(slice(1, -1), )*self.GD] -= dF[tuple(index)]
+        return uh
+
+    def __matmul__(self, uh):
+        return self.matvec(uh)
+
+
+if __name__ == '__main__':
+    from fealpy.mesh import UniformMesh1d, UniformMesh2d
+
+    class Hyperbolic1dPDEData:
+        """
+        @brief Wilbur_hyperbolic 中的算例, u_t - 2 u_x = 0, a = -2
+        """
+        def __init__(self, D=[0, 1], T=[0, 1], smooth=True):
+            self._domain = D
+            self._duration = T
+            self.smooth = smooth
+
+        def domain(self):
+            return self._domain
+
+        def duration(self):
+            return self._duration
+
+        def init_solution(self, p):
+            if self.smooth:
+                return 1 + np.sin(2*np.pi*p)
+            # 带间断的方波
+            return np.where((p > 0.4) & (p < 0.7), 2.0, 1.0)
+
+        def solution(self, p, t):
+            return self.init_solution(p + 2*t)
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+        def a(self):
+            return -2
+
+    def run(pde, nx, scheme, cfl=0.8):
+        domain = pde.domain()
+        duration = pde.duration()
+        T = duration[1]/4
+        hx = (domain[1] - domain[0])/nx
+        mesh = UniformMesh1d([0, nx], h=hx, origin=domain[0])
+        a = pde.a()
+        nt = int(np.ceil(T*abs(a)/(cfl*hx)))
+        tau = T/nt
+        node = mesh.entity('node')
+        if scheme in LIMITERS:
+            A = TVDOperator(mesh, tau, a, limiter=scheme)
+        else:
+            from explicit_stencil import explicit_operator
+            A = explicit_operator(mesh, scheme, tau, a=a)
+        uh = mesh.interpolate(pde.init_solution, 'node')
+        uh1 = np.zeros_like(uh)
+        for n in range(1, nt+1):
+            t = n*tau
+            A.matvec(uh, out=uh1)
+            uh, uh1 = uh1, uh
+            uh[-1] = pde.dirichlet(node[-1], t)
+            uh[0] = 2*uh[1] - uh[2]
+        e = np.abs(uh - pde.solution(node, T))
+        return np.max(e), hx*np.sum(e), np.max(uh) - 2.0
+
+    schemes = ['upwind', 'lax_wendroff'] + list(LIMITERS)
+    for smooth in [True, False]:
+        pde = Hyperbolic1dPDEData(smooth=smooth)
+        print("smooth" if smooth else "square wave")
+        print(f"{'scheme':<14}" + "".join(f"{'nx=' + str(nx):>24}" for nx in [25, 50, 100, 200]))
+        for scheme in schemes:
+            row = f"{scheme:<14}"
+            for nx in [25, 50, 100, 200]:
+                emax, e1, over = run(pde, nx, scheme)
+                row += f"{emax:12.3e}{e1:12.3e}" if smooth else f"{e1:12.3e}{over:12.3e}"
+            print(row)
+
+    # 二维: 方波和紧支集的随机数据, 每一步的全变差都不应增加, 也不应越过初值的上下界
+    def total_variation(u):
+        return np.sum(np.abs(np.diff(u, axis=0))) + np.sum(np.abs(np.diff(u, axis=1)))
+
+    nx = ny = 50
+    mesh = UniformMesh2d([0, nx, 0, ny], h=(1/nx, 1/ny), origin=(0, 0))
+    node = mesh.entity('node')
+    square = np.where((np.abs(node[..., 0] - 0.4) < 0.15) & (np.abs(node[..., 1] - 0.4) < 0.15), 1.0, 0.0)
+    noise = np.zeros_like(square)
+    noise[5:-5, 5:-5] = np.random.default_rng(0).random((nx - 9, ny - 9))
+    print("2d total variation after 20 steps")
+    for name, u0 in [('square', square), ('noise', noise)]:
+        for rx, ry in [(0.49, 0.49), (0.9, -0.7)]:
+            for limiter in LIMITERS:
+                A = TVDOperator(mesh, rx/nx, (1.0, ry/rx), limiter=limiter)
+                uh = u0.copy()
+                tv = total_variation(uh)
+                for n in range(20):
+                    uh = A@uh
+                    tv1 = total_variation(uh)
+                    assert tv1 <= tv*(1 + 1e-12), f"{limiter}: total variation grows from {tv} to {tv1}"
+                    tv = tv1
+                assert np.max(uh) <= np.max(u0) + 1e-12 and np.min(uh) >= np.min(u0) - 1e-12
+                print(f"{name:<8} r = ({rx:5.2f}, {ry:5.2f}) {limiter:<10} "
+                      f"TV {total_variation(u0):9.3f} -> {tv:9.3f}")
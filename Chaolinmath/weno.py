@@ -0,0 +1,304 @@
+import numpy as np
+from stability import choose_nt
+from time_integrator import TimeIntegrator
+
+# 三个三点子模板的线性权
+WENO_D = (0.1, 0.6, 0.3)
+
+def weno5(v0, v1, v2, v3, v4, variant='js', eps=None):
+    """
+    @brief 五阶 WENO 重构, 由 v_{j-2}, ..., v_{j+2} 给出 j+1/2 处的左偏值
+
+    @param[in] v0, ..., v4 numpy.ndarray, 形状相同, 逐元素计算
+    @param[in] variant str, 'js' (Jiang-Shu 权) 或 'z' (WENO-Z 权, 在光滑极值点
+               附近仍保持五阶)
+    @param[in] eps float, 防止除零的小量, 默认 'js' 取 1e-6, 'z' 取 1e-40
+
+    右偏的重构只需把模板倒过来传入.
+    """
+    b0 = 13/12*(v0 - 2*v1 + v2)**2 + 1/4*(v0 - 4*v1 + 3*v2)**2
+    b1 = 13/12*(v1 - 2*v2 + v3)**2 + 1/4*(v1 - v3)**2
+    b2 = 13/12*(v2 - 2*v3 + v4)**2 + 1/4*(3*v2 - 4*v3 + v4)**2
+    d0, d1, d2 = WENO_D
+    if variant == 'js':
+        eps = 1e-6 if eps is None else eps
+        a0 = d0/(eps + b0)**2
+        a1 = d1/(eps + b1)**2
+        a2 = d2/(eps + b2)**2
+    elif variant == 'z':
+        eps = 1e-40 if eps is None else eps
+        tau5 = np.abs(b0 - b2)
+        a0 = d0*(1 + (tau5/(eps + b0))**2)
+        a1 = d1*(1 + (tau5/(eps + b1))**2)
+        a2 = d2*(1 + (tau5/(eps + b2))**2)
+    else:
+        raise ValueError(f"Unknown WENO variant: {variant}")
+    q0 = (2*v0 - 7*v1 + 11*v2)/6
+    q1 = (-v1 + 5*v2 + 2*v3)/6
+    q2 = (2*v2 + 5*v3 - v4)/6
+    return (a0*q0 + a1*q1 + a2*q2)/(a0 + a1 + a2)
+
+class WENO5Operator:
+    """
+    @brief 一维守恒律 u_t + f(u)_x = 0 的五阶 WENO 有限差分空间离散
+
+    在节点值上做守恒型有限差分 (Shu-Osher), 数值通量由通量分裂
+        f(u) = f^+(u) + f^-(u)
+    后 f^+ 左偏、f^- 右偏的 WENO 重构得到. 线性对流 f = a u 时取
+    f^+ = max(a, 0) u, f^- = min(a, 0) u, a 的两种符号都是迎风的,
+    只重构非零的一半; 一般的通量 (如 Burgers 方程 f = u^2/2) 用全局
+    Lax-Friedrichs 分裂 f^± = (f ± alpha u)/2, alpha = max|f'(u)|.
+    所有界面一次整体计算, 没有对单元的 Python 循环.
+
+    周期边界时最后一个节点与第一个节点重合, 只推进前 NN-1 个节点,
+    最后一个节点复制第一个节点的值, 因此节点数组与 mesh.error 等接口一致.
+    非周期时两侧各需要 3 个区域外的虚拟节点, 其值由 gD(p, t) 给出,
+    所以 gD 要在区域外的点上有定义 (例如真解).
+    """
+    def __init__(self, mesh, a=None, flux=None, dflux=None,
+            periodic=True, gD=None, variant='js'):
+        """
+        @param[in] mesh UniformMesh1d
+        @param[in] a float, 线性对流速度, 给出 flux 时不用
+        @param[in] flux, dflux 函数, 通量 f(u) 及其导数 f'(u)
+        @param[in] periodic bool, 是否为周期边界
+        @param[in] gD 函数 gD(p, t), 非周期时虚拟节点上的值
+        @param[in] variant str, WENO 权, 见 weno5
+        """
+        if flux is None and a is None:
+            raise ValueError("Either a or flux should be given")
+        if not periodic and gD is None:
+            raise ValueError("gD is needed for non-periodic boundary")
+        self.h = mesh.h
+        self.a = a
+        self.flux = flux
+        self.dflux = dflux
+        self.periodic = periodic
+        self.gD = gD
+        self.variant = variant
+
+        node = mesh.entity('node')
+        NN = len(node)
+        # 推进的节点个数
+        self.M = NN - 1 if periodic else NN
+        self._pad = np.zeros(self.M + 6, dtype=mesh.ftype)
+        if not periodic:
+            h = self.h
+            self._left = node[0] - h*np.arange(3, 0, -1)
+            self._right = node[-1] + h*np.arange(1, 4)
+
+    def pad(self, uh, t):
+        """
+        @brief 两侧各补 3 个虚拟节点, 写入预先分配的数组
+        """
+        M = self.M
+        up = self._pad
+        up[3:-3] = uh[:M]
+        if self.periodic:
+            up[:3] = uh[M-3:M]
+            up[-3:] = uh[:3]
+        else:
+            up[:3] = self.gD(self._left, t)
+            up[-3:] = self.gD(self._right, t)
+        return up
+
+    def split(self, up):
+        """
+        @brief 通量分裂, 返回 (f^+, f^-), 恒为零的一半返回 None
+        """
+        if self.flux is None:
+            a = self.a
+            return (a*up if a > 0 else None), (a*up if a < 0 else None)
+        f = self.flux(up)
+        alpha = np.max(np.abs(self.dflux(up)))
+        return (f + alpha*up)/2, (f - alpha*up)/2
+
+    def numerical_flux(self, uh, t=0.0):
+        """
+        @brief 第 0 个到第 M-1 个节点两侧共 M+1 个界面上的数值通量
+        """
+        fp, fm = self.split(self.pad(uh, t))
+        n = self.M + 1
+        F = np.zeros(n, dtype=self._pad.dtype)
+        if fp is not None:
+            # 界面 j+1/2 的左偏模板 j-2, ..., j+2
+            F += weno5(*(fp[k:k+n] for k in range(5)), variant=self.variant)
+        if fm is not None:
+            # 右偏模板 j+3, ..., j-1
+            F += weno5(*(fm[5-k:5-k+n] for k in range(5)), variant=self.variant)
+        return F
+
+    def __call__(self, uh, t=0.0, out=None):
+        """
+        @brief 半离散方程的右端 -(F_{j+1/2} - F_{j-1/2})/h
+
+        @param[in] uh numpy.ndarray, 节点上的值
+        @param[out] out numpy.ndarray, 形状与 uh 相同, 默认返回新数组
+        """
+        M = self.M
+        F = self.numerical_flux(uh, t)
+        if out is None:
+            out = np.empty_like(uh)
+        np.subtract(F[:-1], F[1:], out=out[:M])
+        out[:M] /= self.h
+        if self.periodic:
+            out[M:] = out[0]
+        return out
+
+class WENOIntegrator(TimeIntegrator):
+    """
+    @brief WENO5 空间离散加强稳定保持 (SSP) Runge-Kutta 时间推进
+
+    PDE 数据提供 a() 时为线性对流方程 u_t + a u_x = 0; 提供 flux(u) 和
+    dflux(u) 时为一般的守恒律, 例如 Burgers 方程. SSP-RK 的每一级都是
+    向前欧拉步的凸组合, 所以 WENO 空间离散不产生的振荡在时间推进中也不会产生.
+    """
+    def __init__(self, mesh, pde, nt, rk=3, periodic=True, variant='js', cfl=0.8, tol=None):
+        """
+        @param[in] nt int, 时间步数, 为 None 时按 CFL 数 cfl 选取
+        @param[in] tol float, nt 为 None 时时间误差 tau^rk 的目标, 例如取 h^5
+                   使时间误差与空间误差同阶; 默认只受 CFL 条件限制
+        @param[in] rk int, SSP-RK 的阶数, 2 或 3
+        @param[in] periodic bool, 为 False 时虚拟节点取 pde.dirichlet 的值
+        @param[in] variant str, WENO 权, 'js' 或 'z'
+        """
+        if rk not in (2, 3):
+            raise ValueError(f"SSP-RK of order {rk} is not supported")
+        flux = getattr(pde, 'flux', None)
+        dflux = getattr(pde, 'dflux', None)
+        a = None if flux is not None else pde.a()
+        if nt is None:
+            if flux is not None:
+                u0 = mesh.interpolate(pde.init_solution, 'node')
+                speed = np.max(np.abs(dflux(u0)))
+            else:
+                speed = a
+            nt = choose_nt(mesh, 'upwind', pde.duration(), a=speed, safety=cfl,
+                    tol=None if tol is None else tol**(1/rk))
+        super().__init__(mesh, pde, nt)
+        self.rk = rk
+        self.L = WENO5Operator(mesh, a=a, flux=flux, dflux=dflux, periodic=periodic,
+                gD=None if periodic else pde.dirichlet, variant=variant)
+        self.u1 = self.new_buffer()
+        self.u2 = self.new_buffer()
+        self._k = self.new_buffer()
+
+    def euler(self, u, t, out):
+        """
+        @brief out = u + tau*L(u, t)
+        """
+        k = self.L(u, t, out=self._k)
+        k *= self.tau
+        np.add(u, k, out=out)
+        return out
+
+    def step(self, n):
+        t = self.t0 + n*self.tau
+        tau = self.tau
+        u, u1, u2 = self.uh, self.u1, self.u2
+        self.euler(u, t, out=u1)
+        if self.rk == 2:
+            self.euler(u1, t + tau, out=u2)
+            u += u2
+            u *= 1/2
+            return
+        self.euler(u1, t + tau, out=u2)
+        u2 *= 1/4
+        u2 += 3/4*u
+        self.euler(u2, t + tau/2, out=u1)
+        u1 *= 2/3
+        u *= 1/3
+        u += u1
+
+
+if __name__ == '__main__':
+    from fealpy.mesh import UniformMesh1d
+    from time_integrator import HyperbolicIntegrator
+
+    class Hyperbolic1dPDEData:
+        """
+        @brief Wilbur_hyperbolic 中的算例, u_t - 2 u_x = 0, a = -2
+        """
+        def __init__(self, D=[0, 1], T=[0, 1]):
+            self._domain = D
+            self._duration = T
+
+        def domain(self):
+            return self._domain
+
+        def duration(self):
+            return self._duration
+
+        def solution(self, p, t):
+            return 1 + np.sin(2*np.pi*(p + 2*t))
+
+        def init_solution(self, p):
+            return 1 + np.sin(2*np.pi*p)
+
+        def source(self, p, t):
+            return np.zeros_like(p)
+
+        def dirichlet(self, p, t):
+            return self.solution(p, t)
+
+        def a(self):
+            return -2
+
+    class Burgers1dPDEData:
+        """
+        @brief 周期 Burgers 方程 u_t + (u^2/2)_x = 0, t = 1/(2 pi) 时出现激波
+        """
+        def domain(self):
+            return [0, 1]
+
+        def duration(self):
+            return [0, 0.3]
+
+        def init_solution(self, p):
+            return 0.5 + np.sin(2*np.pi*p)
+
+        def flux(self, u):
+            return u**2/2
+
+        def dflux(self, u):
+            return u
+
+    def run(pde, nx, scheme, cfl=0.8):
+        domain = pde.domain()
+        duration = pde.duration()
+        hx = (domain[1] - domain[0])/nx
+        mesh = UniformMesh1d([0, nx], h=hx, origin=domain[0])
+        if scheme.startswith('weno'):
+            # 时间步长同时满足 CFL 条件和 tau^3 <= h^5
+            integrator = WENOIntegrator(mesh, pde, None, variant=scheme[5:],
+                    cfl=cfl, tol=hx**5)
+        else:
+            # 取 |r| = 1 时迎风类格式恰好是精确的平移, 比较时统一取 |r| = cfl
+            nt = choose_nt(mesh, 'upwind', duration, a=pde.a(), safety=cfl)
+            integrator = HyperbolicIntegrator(mesh, pde, nt, scheme=scheme)
+        for t, uh in integrator.steps():
+            pass
+        return mesh, integrator, uh, t
+
+    pde = Hyperbolic1dPDEData()
+    NX = [10, 20, 40, 80, 160]
+    print(f"{'scheme':<14}" + "".join(f"{'nx=' + str(nx):>11}" for nx in NX))
+    for scheme in ['lax_wendroff', 'van_leer', 'weno_js', 'weno_z']:
+        row = f"{scheme:<14}"
+        for nx in NX:
+            mesh, _, uh, t = run(pde, nx, scheme)
+            e = np.max(np.abs(uh - pde.solution(mesh.entity('node'), t)))
+            row += f"{e:11.3e}"
+        print(row)
+
+    pde = Burgers1dPDEData()
+    u0 = 0.5 + np.sin(2*np.pi*np.linspace(0, 1, 201))
+    mesh = UniformMesh1d([0, 200], h=1/200, origin=0)
+    # 有激波时精度只有一阶, 时间步长只受 CFL 条件限制
+    integrator = WENOIntegrator(mesh, pde, None)
+    for t, uh in integrator.steps():
+        pass
+    tv = lambda u: np.sum(np.abs(np.diff(u)))
+    print(f"Burgers t = {t:.2f}, nt = {integrator.nt}: "
+            f"min {np.min(uh):.4f} max {np.max(uh):.4f} (initial {np.min(u0):.4f}, {np.max(u0):.4f}), "
+            f"TV {tv(uh):.4f} (initial {tv(u0):.4f})")
@@ -3,6 +3,11 @@ import matplotlib.pyplot as plt
 from fealpy.mesh import UniformMesh1d
 from fealpy.mesh.uniform_mesh_1d import UniformMesh1d
 from scipy.sparse.linalg import spsolve
+import os
+import sys
+# Chaolinmath 中的公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chaolinmath'))
+from condensation import DirichletCondensation
 from fealpy.pde.wave_1d import StringOscillationPDEData
 
 class StringOscillationSinCosPDEData:
@@ -109,6 +114,9 @@ uh0 = mesh.interpolate(pde.init_solution, 'node')
 vh0 = mesh.interpolate(pde.init_solution_diff_t, 'node')
 uh1 = mesh.function('node')
 
+# 隐格式矩阵只依赖 tau 和 theta, 分解一次后在每一步复用
+_implicit_cache = {}
+
 def advance_explicit(n, *frags):
     """
     @brief 时间步进格式为显格式
@@ -156,7 +164,12 @@ def advance_implicit(n, theta=0.25, *frags):
         mesh.update_dirichlet_bc(gD, uh1)
         return uh1, t
     else:
-        A0, A1, A2 = mesh.wave_operator_implicit(tau, theta=theta)
+        if (tau, theta) not in _implicit_cache:
+            A0, A1, A2 = mesh.wave_operator_implicit(tau, theta=theta)
+            isBdNode = mesh.ds.boundary_node_flag()
+            # 一维时内部块是三对角的, 用 LAPACK 的 gttrf 分解一次
+            _implicit_cache[tau, theta] = (A1, A2, isBdNode, DirichletCondensation(A0, isBdNode))
+        A1, A2, isBdNode, bc = _implicit_cache[tau, theta]
         source = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         f *= tau**2
@@ -164,8 +177,8 @@ def advance_implicit(n, theta=0.25, *frags):
 
         uh0[:] = uh1[:]
         gD = lambda p: pde.dirichlet(p, t + tau)
-        A0, f = mesh.apply_dirichlet_bc(gD, A0, f)
-        uh1[:] = spsolve(A0, f)
+        node = mesh.entity('node')
+        uh1[:] = bc.solve(f, gD(node[isBdNode]))
 
         return uh1, t
 """
@@ -194,9 +207,12 @@ for i in range(nt+1):
         axes.set_title(f't = {duration[0] + i*tau}')
         plt.show()
 """
+# 输出时刻换算为时间步编号, 不直接比较累加出来的浮点数时间
+out_steps = {int(round((s - duration[0])/tau)): s for s in [0.5, 1.0, 1.5, 2.0]}
 for i in range(nt+1):
-    u, t = advance_implicit(i)
-    if t in [0.5, 1.0, 1.5, 2.0]:
+    u, _ = advance_implicit(i)
+    if i in out_steps:
+        t = out_steps[i]
         fig, axes = plt.subplots(2, 1)
         x = mesh.entity('node').reshape(-1)
         true_solution = pde.solution(x, t)
@@ -3,6 +3,11 @@ import matplotlib.pyplot as plt
 from fealpy.mesh import UniformMesh1d
 from fealpy.decorator import cartesian
 from scipy.sparse.linalg import spsolve
+import os
+import sys
+# Chaolinmath 中的公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Chaolinmath'))
+from condensation import DirichletCondensation
 class StringOscillationPDEData:
     def __init__(self, D=[0, 1], T=[0, 2]): #nt = 40
 
@@ -73,6 +78,9 @@ uh0 = mesh.interpolate(pde.init_solution, 'node')
 vh0 = mesh.interpolate(pde.init_solution_diff_t, 'node')
 uh1 = mesh.function('node')
 
+# 隐格式矩阵只依赖 tau 和 theta, 分解一次后在每一步复用
+_implicit_cache = {}
+
 def advance_explicit(n, *frags):
     """
     @brief 时间步进格式为显格式
@@ -120,7 +128,12 @@ def advance_implicit(n, theta=0.25, *frags):
         mesh.update_dirichlet_bc(gD, uh1)
         return uh1, t
     else:
-        A0, A1, A2 = mesh.wave_operator_implicit(tau, theta=theta)
+        if (tau, theta) not in _implicit_cache:
+            A0, A1, A2 = mesh.wave_operator_implicit(tau, theta=theta)
+            isBdNode = mesh.ds.boundary_node_flag()
+            # 一维时内部块是三对角的, 用 LAPACK 的 gttrf 分解一次
+            _implicit_cache[tau, theta] = (A1, A2, isBdNode, DirichletCondensation(A0, isBdNode))
+        A1, A2, isBdNode, bc = _implicit_cache[tau, theta]
         source = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         f *= tau**2
@@ -128,8 +141,8 @@ def advance_implicit(n, theta=0.25, *frags):
 
         uh0[:] = uh1[:]
         gD = lambda p: pde.dirichlet(p, t + tau)
-        A0, f = mesh.apply_dirichlet_bc(gD, A0, f)
-        uh1[:] = spsolve(A0, f)
+        node = mesh.entity('node')
+        uh1[:] = bc.solve(f, gD(node[isBdNode]))
             
         return uh1, t
 
@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 from fealpy.mesh.uniform_mesh_2d import UniformMesh2d
 from fealpy.pde.elliptic_2d import CosCosPDEData
 from scipy.sparse.linalg import spsolve
+from fast_poisson import fast_poisson_solve
 
 # pde模型
 pde = CosCosPDEData()
@@ -89,11 +90,9 @@ maxit = 5
 em = np.zeros((3, maxit), dtype=np.float64)
 
 for i in range(maxit):
-    A = mesh.laplace_operator() 
-    uh = mesh.function()
+    # 矩形区域上用 DST 快速求解, 与组装矩阵后 spsolve 的结果只差舍入误差
     f = mesh.interpolate(pde.source, 'node')
-    A, f = mesh.apply_dirichlet_bc(pde.dirichlet, A, f)
-    uh.flat[:] = spsolve(A, f)  
+    uh = fast_poisson_solve(mesh, f, pde.dirichlet)
     em[0, i], em[1, i], em[2, i] = mesh.error(pde.solution, uh)
 
     if i < maxit:
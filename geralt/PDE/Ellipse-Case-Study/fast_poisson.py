@@ -0,0 +1,90 @@
+import numpy as np
+from scipy.fft import dstn, idstn
+
+def laplace_eigenvalues(n, h):
+    """
+    @brief 一维三点差分 -u'' 在 n-1 个内部节点 (齐次 Dirichlet 边界) 上的特征值
+
+    @param[in] n int, 剖分段数
+    @param[in] h float, 网格步长
+    """
+    k = np.arange(1, n)
+    return 4/h**2*np.sin(k*np.pi/(2*n))**2
+
+def fast_poisson_solve(mesh, f, gD, c=0.0):
+    """
+    @brief 用离散正弦变换 (DST-I) 求解矩形区域上的 (-Δ_h + c) u = f, Dirichlet 边界条件
+
+    与 mesh.laplace_operator() + mesh.apply_dirichlet_bc + spsolve 求解的是同一个
+    离散系统: 先把边界值提升 (lifting) 到内部节点的右端项中, 再在内部节点上用
+    DST 对角化差分算子, 不需要组装矩阵, 计算量为 O(N log N).
+
+    @param[in] mesh UniformMesh1d 或 UniformMesh2d
+    @param[in] f numpy.ndarray, 网格节点上的右端项, 如 mesh.interpolate(pde.source, 'node')
+    @param[in] gD Dirichlet 边界条件函数
+    @param[in] c float, 零阶项系数, 默认为 0 (Poisson 方程)
+
+    @return uh 网格节点上的数值解, 形状与 mesh.function() 相同
+    """
+    node = mesh.entity('node')
+    uh = mesh.function()
+    isBdNode = mesh.ds.boundary_node_flag().reshape(uh.shape)
+    uh[isBdNode] = gD(node[isBdNode])
+    f = np.broadcast_to(f, uh.shape)
+
+    if uh.ndim == 1:
+        h = mesh.h
+        F = f[1:-1] + 0.0
+        F[0] += uh[0]/h**2
+        F[-1] += uh[-1]/h**2
+        lam = laplace_eigenvalues(mesh.nx, h) + c
+    else:
+        hx, hy = mesh.h
+        F = f[1:-1, 1:-1] + 0.0
+        F[0, :] += uh[0, 1:-1]/hx**2
+        F[-1, :] += uh[-1, 1:-1]/hx**2
+        F[:, 0] += uh[1:-1, 0]/hy**2
+        F[:, -1] += uh[1:-1, -1]/hy**2
+        lam = laplace_eigenvalues(mesh.nx, hx)[:, None] + laplace_eigenvalues(mesh.ny, hy)[None, :] + c
+
+    F = dstn(F, type=1)
+    F /= lam
+    uh[(slice(1, -1), )*uh.ndim] = idstn(F, type=1)
+    return uh
+
+
+if __name__ == '__main__':
+    import time
+    from scipy.sparse.linalg import spsolve
+    from fealpy.pde.elliptic_2d import CosCosPDEData
+    from fealpy.mesh.uniform_mesh_2d import UniformMesh2d
+
+    pde = CosCosPDEData()
+    domain = pde.domain()
+    nx = 5
+    ny = 5
+    hx = (domain[1] - domain[0])/nx
+    hy = (domain[3] - domain[2])/ny
+    mesh = UniformMesh2d((0, nx, 0, ny), h=(hx, hy), origin=(domain[0], domain[2]))
+
+    # 测试收敛阶, 并与稀疏矩阵的解比较
+    maxit = 5
+    em = np.zeros((3, maxit), dtype=np.float64)
+    for i in range(maxit):
+        f = mesh.interpolate(pde.source, 'node')
+        start = time.time()
+        uh = fast_poisson_solve(mesh, f, pde.dirichlet)
+        t0 = time.time() - start
+
+        start = time.time()
+        A = mesh.laplace_operator()
+        A, f = mesh.apply_dirichlet_bc(pde.dirichlet, A, f)
+        us = spsolve(A, f).reshape(uh.shape)
+        t1 = time.time() - start
+        print(f"nx = {mesh.nx}: |uh - spsolve| = {np.max(np.abs(uh - us)):.3e}, dst {t0:.4f}s, spsolve {t1:.4f}s")
+
+        em[0, i], em[1, i], em[2, i] = mesh.error(pde.solution, uh)
+        if i < maxit:
+            mesh.uniform_refine()
+
+    print("em_ratio:", em[:, 0:-1]/em[:, 1:])
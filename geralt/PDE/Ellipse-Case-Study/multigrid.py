@@ -0,0 +1,230 @@
+import numpy as np
+from scipy.sparse import diags, identity, kron
+from scipy.sparse.linalg import factorized, LinearOperator
+
+def interior_laplace(n, h, c=0.0):
+    """
+    @brief 组装 -Δ_h + c 在内部节点 (齐次 Dirichlet 边界) 上的矩阵, 节点按 (nx-1, ny-1) 的 C 顺序编号
+
+    @param[in] n tuple, 每个方向的剖分段数
+    @param[in] h tuple, 每个方向的网格步长
+    """
+    T = [diags([-1, 2, -1], [-1, 0, 1], shape=(m-1, m-1))/hi**2 for m, hi in zip(n, h)]
+    if len(n) == 1:
+        A = T[0]
+    else:
+        A = kron(T[0], identity(n[1]-1)) + kron(identity(n[0]-1), T[1])
+    return (A + c*identity(A.shape[0])).tocsr()
+
+def _sl(ndim, axis, s):
+    """
+    @brief 只在第 axis 个方向上取切片 s
+    """
+    idx = [slice(None)]*ndim
+    idx[axis] = s
+    return tuple(idx)
+
+class GeometricMultigrid:
+    """
+    @brief UniformMesh1d/UniformMesh2d 上 -Δ_h + c 的几何多重网格求解器
+
+    网格层次与 mesh.uniform_refine() 得到的网格序列一致 (每层步长加倍), 层间用
+    全加权限制和 (双) 线性插值, 光滑子为加权 Jacobi, 全部用节点数组上的切片运算完成.
+    支持 V, W, F 循环, 也可以作为共轭梯度法的预条件子.
+    隐式抛物格式的矩阵 I - tau*Δ_h 除以 tau 后就是 c = 1/tau 的情形.
+    """
+    def __init__(self, mesh, c=0.0, cycle='V', nu1=2, nu2=2, omega=None, ncoarse=2):
+        """
+        @brief 初始化函数
+
+        @param[in] mesh UniformMesh1d 或 UniformMesh2d, 最细层网格
+        @param[in] c float, 零阶项系数
+        @param[in] cycle str, 'V', 'W' 或 'F'
+        @param[in] nu1, nu2 int, 前、后光滑次数
+        @param[in] omega float, Jacobi 松弛因子, 默认一维 2/3, 二维 4/5
+        @param[in] ncoarse int, 最粗层每个方向的段数不超过 ncoarse 时停止粗化
+        """
+        if hasattr(mesh, 'ny'):
+            n = (mesh.nx, mesh.ny)
+            h = tuple(mesh.h)
+        else:
+            n = (mesh.nx, )
+            h = (mesh.h, )
+        self.GD = len(n)
+        self.c = c
+        self.cycle = cycle
+        self.nu1 = nu1
+        self.nu2 = nu2
+        self.omega = omega if omega is not None else (2/3 if self.GD == 1 else 4/5)
+
+        # 从细到粗的网格层, 每层为 (段数, 步长)
+        self.levels = [(n, h)]
+        while all(m % 2 == 0 for m in n) and min(n) > ncoarse:
+            n = tuple(m//2 for m in n)
+            h = tuple(2*hi for hi in h)
+            self.levels.append((n, h))
+        self._coarse = factorized(interior_laplace(n, h, c).tocsc())
+        self.inner = (slice(1, -1), )*self.GD
+
+    def apply(self, u, h):
+        """
+        @brief 计算内部节点上的 (-Δ_h + c) u, 边界节点上为零
+        """
+        out = np.zeros_like(u)
+        inner = self.inner
+        out[inner] = self.c*u[inner]
+        for d in range(self.GD):
+            sm = list(inner)
+            sp = list(inner)
+            sm[d] = slice(0, -2)
+            sp[d] = slice(2, None)
+            out[inner] += (2*u[inner] - u[tuple(sm)] - u[tuple(sp)])/h[d]**2
+        return out
+
+    def smooth(self, u, f, h, nu):
+        """
+        @brief 加权 Jacobi 光滑, 直接修改 u
+        """
+        dinv = self.omega/(self.c + sum(2/hi**2 for hi in h))
+        for _ in range(nu):
+            r = f - self.apply(u, h)
+            u[self.inner] += dinv*r[self.inner]
+        return u
+
+    def restrict(self, r):
+        """
+        @brief 全加权限制, 边界节点上为零
+        """
+        for d in range(self.GD):
+            m = r.shape[d] - 1
+            shape = list(r.shape)
+            shape[d] = m//2 + 1
+            rc = np.zeros(shape, dtype=r.dtype)
+            rc[_sl(self.GD, d, slice(1, -1))] = 0.25*r[_sl(self.GD, d, slice(1, m-2, 2))] + \
+                    0.5*r[_sl(self.GD, d, slice(2, m-1, 2))] + \
+                    0.25*r[_sl(self.GD, d, slice(3, m, 2))]
+            r = rc
+        return r
+
+    def prolong(self, e):
+        """
+        @brief (双) 线性插值
+        """
+        for d in range(self.GD):
+            m = e.shape[d] - 1
+            shape = list(e.shape)
+            shape[d] = 2*m + 1
+            ef = np.zeros(shape, dtype=e.dtype)
+            ef[_sl(self.GD, d, slice(0, None, 2))] = e
+            ef[_sl(self.GD, d, slice(1, None, 2))] = 0.5*(e[_sl(self.GD, d, slice(0, -1))] + e[_sl(self.GD, d, slice(1, None))])
+            e = ef
+        return e
+
+    def _cycle(self, l, u, f, cycle):
+        n, h = self.levels[l]
+        if l == len(self.levels) - 1:
+            u[self.inner] = self._coarse(f[self.inner].reshape(-1)).reshape(tuple(m-1 for m in n))
+            return u
+
+        self.smooth(u, f, h, self.nu1)
+        rc = self.restrict(f - self.apply(u, h))
+        ec = np.zeros_like(rc)
+        if cycle == 'V':
+            self._cycle(l+1, ec, rc, 'V')
+        elif cycle == 'W':
+            self._cycle(l+1, ec, rc, 'W')
+            self._cycle(l+1, ec, rc, 'W')
+        elif cycle == 'F':
+            self._cycle(l+1, ec, rc, 'F')
+            self._cycle(l+1, ec, rc, 'V')
+        else:
+            raise ValueError(f"Unknown cycle: {cycle}")
+        u += self.prolong(ec)
+        self.smooth(u, f, h, self.nu2)
+        return u
+
+    def solve(self, mesh, f, gD, tol=1e-10, maxit=50):
+        """
+        @brief 求解 (-Δ_h + c) u = f, Dirichlet 边界条件
+
+        @param[in] f numpy.ndarray, 网格节点上的右端项
+        @param[in] gD Dirichlet 边界条件函数
+
+        @return uh 数值解, res 每次循环后的相对残量
+        """
+        node = mesh.entity('node')
+        uh = mesh.function()
+        isBdNode = mesh.ds.boundary_node_flag().reshape(uh.shape)
+        uh[isBdNode] = gD(node[isBdNode])
+        f = np.array(np.broadcast_to(f, uh.shape), dtype=np.float64)
+        f[isBdNode] = 0.0
+
+        h = self.levels[0][1]
+        r0 = np.linalg.norm(f - self.apply(uh, h))
+        res = []
+        for i in range(maxit):
+            self._cycle(0, uh, f, self.cycle)
+            res.append(np.linalg.norm(f - self.apply(uh, h))/r0)
+            if res[-1] < tol:
+                break
+        return uh, np.array(res)
+
+    def preconditioner(self):
+        """
+        @brief 多重网格预条件子, 作用在 mesh.apply_dirichlet_bc 处理后的整个系统上
+
+        边界节点对应的行为单位阵, 因此预条件子在边界节点上也取单位映射,
+        内部节点上从零初值做一次多重网格循环.
+
+        @return scipy.sparse.linalg.LinearOperator, 可以作为 cg 的 M 参数
+        """
+        n, h = self.levels[0]
+        shape = tuple(m+1 for m in n)
+        NN = int(np.prod(shape))
+
+        def matvec(r):
+            r = np.asarray(r, dtype=np.float64).reshape(shape)
+            z = r.copy()
+            z[self.inner] = 0.0
+            f = np.zeros(shape, dtype=np.float64)
+            f[self.inner] = r[self.inner]
+            e = self._cycle(0, np.zeros(shape, dtype=np.float64), f, self.cycle)
+            z[self.inner] = e[self.inner]
+            return z.reshape(-1)
+
+        return LinearOperator((NN, NN), matvec=matvec, dtype=np.float64)
+
+
+if __name__ == '__main__':
+    from scipy.sparse.linalg import cg
+    from fealpy.pde.elliptic_2d import CosCosPDEData
+    from fealpy.mesh.uniform_mesh_2d import UniformMesh2d
+
+    pde = CosCosPDEData()
+    domain = pde.domain()
+    nx = 8
+    ny = 8
+    hx = (domain[1] - domain[0])/nx
+    hy = (domain[3] - domain[2])/ny
+    mesh = UniformMesh2d((0, nx, 0, ny), h=(hx, hy), origin=(domain[0], domain[2]))
+
+    maxit = 5
+    em = np.zeros((3, maxit), dtype=np.float64)
+    for i in range(maxit):
+        f = mesh.interpolate(pde.source, 'node')
+        mg = GeometricMultigrid(mesh, cycle='V')
+        uh, res = mg.solve(mesh, f, pde.dirichlet)
+        em[0, i], em[1, i], em[2, i] = mesh.error(pde.solution, uh)
+
+        # 作为预条件子
+        A = mesh.laplace_operator()
+        A, F = mesh.apply_dirichlet_bc(pde.dirichlet, A, f.copy())
+        it = []
+        x, info = cg(A, F, M=mg.preconditioner(), rtol=1e-10, callback=lambda xk: it.append(1))
+        print(f"nx = {mesh.nx}: {len(res)} V-cycles, {len(it)} PCG iterations, "
+              f"|mg - pcg| = {np.max(np.abs(uh.reshape(-1) - x)):.3e}")
+
+        if i < maxit:
+            mesh.uniform_refine()
+
+    print("em_ratio:", em[:, 0:-1]/em[:, 1:])
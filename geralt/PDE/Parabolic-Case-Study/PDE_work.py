@@ -5,6 +5,11 @@ from fealpy.pde.parabolic_1d import SinExpPDEData
 from fealpy.mesh.uniform_mesh_1d import UniformMesh1d
 from typing import Callable, Tuple, Any
 from scipy.sparse.linalg import spsolve
+import os
+import sys
+# Chaolinmath 中的公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'Chaolinmath'))
+from operator_cache import cached_operator
 
 # PDE 模型
 pde = SinExpPDEData()
@@ -35,7 +40,7 @@ def advance_forward(n: np.int_) -> Tuple[np.ndarray, np.float64]: # 点击这里
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_forward(tau)
+        A, _, _, _ = cached_operator(mesh, 'forward', tau)
         source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         uh0[:] = A@uh0 + tau*f
@@ -58,14 +63,14 @@ def advance_backward(n: np.int_) -> Tuple[np.ndarray, np.float64]: # 点击这
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_backward(tau)
+        _, _, bc, isBdNode = cached_operator(mesh, 'backward', tau)
         source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         f *= tau
         f += uh0
         gD: Callable[[np.ndarray], np.ndarray] = lambda p: pde.dirichlet(p, t + tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0[:] = spsolve(A, f)
+        node = mesh.entity('node')
+        uh0[:] = bc.solve(f, gD(node[isBdNode]))
 
         solution: Callable[[np.ndarray], np.ndarray] = lambda p: pde.solution(p, t + tau)
         e = mesh.error(solution, uh0, errortype='max')
@@ -84,14 +89,14 @@ def advance_backward(n: np.int_) -> Tuple[np.ndarray, np.float64]: # 点击这
     if n == 0:
         return uh0, t
     else:
-        A = mesh.parabolic_operator_backward(tau)
+        _, _, bc, isBdNode = cached_operator(mesh, 'backward', tau)
         source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         f *= tau
         f += uh0
         gD: Callable[[np.ndarray], np.ndarray] = lambda p: pde.dirichlet(p, t + tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0[:] = spsolve(A, f)
+        node = mesh.entity('node')
+        uh0[:] = bc.solve(f, gD(node[isBdNode]))
 
         solution: Callable[[np.ndarray], np.ndarray] = lambda p: pde.solution(p, t + tau)
         e = mesh.error(solution, uh0, errortype='max')
@@ -110,14 +115,14 @@ def advance_crank_nicholson(n: np.int_) -> Tuple[np.ndarray, np.float64]: # 点
     if n == 0:
         return uh0, t
     else:
-        A, B = mesh.parabolic_operator_crank_nicholson(tau)
+        _, B, bc, isBdNode = cached_operator(mesh, 'crank_nicholson', tau)
         source: Callable[[np.ndarray], np.ndarray] = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node')
         f *= tau
         f += B@uh0
         gD: Callable[[np.ndarray], np.ndarray] = lambda p: pde.dirichlet(p, t + tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0[:] = spsolve(A, f)
+        node = mesh.entity('node')
+        uh0[:] = bc.solve(f, gD(node[isBdNode]))
 
         solution: Callable[[np.ndarray], np.ndarray] = lambda p: pde.solution(p, t + tau)
         e = mesh.error(solution, uh0, errortype='max')
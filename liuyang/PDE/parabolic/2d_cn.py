@@ -4,6 +4,11 @@ from scipy.sparse.linalg import spsolve
 from fealpy.mesh import UniformMesh2d
 from fealpy.decorator import cartesian
 from typing import Callable, Tuple, Any
+import os
+import sys
+# Chaolinmath 中的公共模块
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'Chaolinmath'))
+from operator_cache import cached_operator
 
 class SinSinExpPDEData: # 点击这里可查看 FEALPy 仓库中的代码
     def __init__(self, D=[0, 1, 0, 1], T=[0, 1]):
@@ -87,8 +92,8 @@ class SinSinExpPDEData: # 点击这里可查看 FEALPy 仓库中的代码
         y = p[..., 1]
         pi = np.pi
         val = np.zeros(p.shape, dtype=np.float64)
-        val[..., 0] = pi*np.cos(pi*x)*np.sin(pi*y)*np.exp(-2(pi**2)*t)
-        val[..., 1] = pi*np.sin(pi*x)*np.cos(pi*y)*np.exp(-2(pi**2)*t)
+        val[..., 0] = pi*np.cos(pi*x)*np.sin(pi*y)*np.exp(-2*(pi**2)*t)
+        val[..., 1] = pi*np.sin(pi*x)*np.cos(pi*y)*np.exp(-2*(pi**2)*t)
         return val
     
     @cartesian    
@@ -127,15 +132,15 @@ def advance_crank_nicholson(n: np.int_) -> Tuple[np.ndarray, np.float64]: # 点
     if n == 0:
         return uh0, t
     else:
-        A, B = mesh.parabolic_operator_crank_nicholson(tau)
+        _, B, bc, isBdNode = cached_operator(mesh, 'crank_nicholson', tau)
         source = lambda p: pde.source(p, t + tau)
         f = mesh.interpolate(source, intertype='node') # f.shape = (nx+1,ny+1)
         f *= tau
         f.flat[:] += B@uh0.flat[:]
          
         gD = lambda p: pde.dirichlet(p, t+tau)
-        A, f = mesh.apply_dirichlet_bc(gD, A, f)
-        uh0.flat = spsolve(A, f)
+        node = mesh.entity('node').reshape(-1, 2)
+        uh0.flat = bc.solve(f.reshape(-1), gD(node[isBdNode]))
 
         solution = lambda p: pde.solution(p, t + tau)
         e = mesh.error(solution, uh0, errortype='max')
@@ -87,8 +87,8 @@ class SinSinExpPDEData: # 点击这里可查看 FEALPy 仓库中的代码
         y = p[..., 1]
         pi = np.pi
         val = np.zeros(p.shape, dtype=np.float64)
-        val[..., 0] = pi*np.cos(pi*x)*np.sin(pi*y)*np.exp(-2(pi**2)*t)
-        val[..., 1] = pi*np.sin(pi*x)*np.cos(pi*y)*np.exp(-2(pi**2)*t)
+        val[..., 0] = pi*np.cos(pi*x)*np.sin(pi*y)*np.exp(-2*(pi**2)*t)
+        val[..., 1] = pi*np.sin(pi*x)*np.cos(pi*y)*np.exp(-2*(pi**2)*t)
         return val
     
     @cartesian    
@@ -45,15 +45,12 @@ class Hyperbolic2dPDEData: # 点击这里可以查看 FEALPy 中的代码
         val = np.zeros_like(p[...,0])
 
         m = x*y
-        nx , ny = m.shape
-        for i in range(nx):
-            for j in range(ny):
-                if m[i,j] <= t:
-                    val[i,j]= 1.0
-                elif m[i,j] > t+1:
-                    val[i,j] = m[i,j] - t - 1.0
-                else:
-                    val[i,j] = 1.0 - m[i,j] +t
+        flag0 = m <= t
+        flag1 = m > t+1
+        flag2 = ~(flag0 | flag1)
+        val[flag0] = 1.0
+        val[flag1] = m[flag1] - t - 1.0
+        val[flag2] = 1.0 - m[flag2] + t
         return val
     
     def source(self, p, t):
@@ -142,21 +142,20 @@ def advance(n, *frags):
             
         return uh1, t
 
+# 只推进一遍, 在输出时刻同时画数值解和误差
+x = mesh.entity('node').reshape(-1)
+# 输出时刻换算为时间步编号, 不直接比较累加出来的浮点数时间
+out_steps = {int(round((s - duration[0])/tau)): s for s in [0.5, 1.0, 1.5, 2.0]}
 for i in range(nt+1):
     u, _ = advance(i)
-    if (duration[0] + i*tau) in [0.5, 1.0, 1.5, 2.0]:
+    if i in out_steps:
+        t = out_steps[i]
         fig, axes = plt.subplots()
-        x = mesh.entity('node').flat
         axes.plot(x, u)
         axes.set_ylim(-2, 2)
-        axes.set_title(f't = {duration[0] + i*tau}')
-        plt.show()
-        
-for i in range(nt+1):
-    u, t = advance(i)
-    if t in [0.5, 1.0, 1.5, 2.0]:
+        axes.set_title(f't = {t}')
+
         fig, axes = plt.subplots(2, 1)
-        x = mesh.entity('node').reshape(-1)
         true_solution = pde.solution(x,t)
         # 计算误差
         # E = mesh.error(true_solution, u)